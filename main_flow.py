@@ -1,7 +1,8 @@
 from prefect import flow, task, get_run_logger
-from utils.data_utils import run_incremental, run_incremental_feature_generation, merge_features
+from utils.data_utils import run_incremental, run_incremental_feature_generation, merge_features, compact_daily_files
 from utils.model_utils import load_config, search_best_params, train_xgboost
 from utils.s3_utils import upload_model_to_s3
+from utils.monitor_utils import check_drift, decide_retraining, REFERENCE_STATS_NAME
 import os
 from dotenv import load_dotenv
 import time 
@@ -17,34 +18,67 @@ CONFIG_PATH = os.getenv("CONFIG_PATH", "config.json")
 MODEL_FILE = os.path.join(MODEL_DIR, "latest_model.json")
 BUCKET_NAME = os.getenv("MODEL_BUCKET")
 S3_KEY = "model/latest_model.json"
-os.makedirs(FEATURE_DIR, exist_ok=True)
-os.makedirs(MODEL_DIR, exist_ok=True)
-os.makedirs(PARAM_DIR, exist_ok=True)
 
 @task
-def fetch_closed_issues_task(date=None):
+def fetch_closed_issues_task(date=None, config_path=CONFIG_PATH):
     """
     Fetch closed issues for the specified date (defaults to yesterday).
     """
-    run_incremental(GITHUB_TOKEN, REPO_NAME, DATA_DIR, date)
+    write_options = load_config(config_path).get("raw_storage")
+    run_incremental(GITHUB_TOKEN, REPO_NAME, DATA_DIR, date, write_options=write_options)
 
 @task
-def generate_features_task(date=None):
+def generate_features_task(date=None, config_path=CONFIG_PATH):
     """
     Incremental feature engineering (defaults to yesterday).
     """
-    run_incremental_feature_generation(DATA_DIR, FEATURE_DIR, date)
+    use_text = load_config(config_path).get("use_text_features", False)
+    run_incremental_feature_generation(DATA_DIR, FEATURE_DIR, date, text_features=use_text)
+
+@task
+def compact_daily_files_task(config_path=CONFIG_PATH):
+    """
+    Fold daily raw/feature files of old months into monthly files.
+    """
+    config = load_config(config_path)
+    compact_after_days = config.get("compact_after_days", 31)
+    if compact_after_days is None:
+        return
+    compact_daily_files(DATA_DIR, FEATURE_DIR, compact_after_days, write_options=config.get("raw_storage"))
 
 @task
 def merge_features_task(
     feature_dir=FEATURE_DIR,
-    output_name="issues_features_full_plus_increment.parquet"
+    output_name="issues_features_full_plus_increment.parquet",
+    config_path=CONFIG_PATH
 ):
     """
     Merge all feature files: prioritize the full feature file, supplement with incrementals, 
-    and output the final deduplicated feature set.
+    and output the final deduplicated feature set, limited to the training window.
+    """
+    window = load_config(config_path).get("training_window")
+    merge_features(feature_dir, output_name=output_name, window=window)
+
+@task
+def check_drift_task(date=None, feature_dir=FEATURE_DIR, param_dir=PARAM_DIR, config_path=CONFIG_PATH, force=False):
+    """
+    Compute stats for new daily feature files, compare the most recent days with the
+    distribution the current params were tuned on (PSI), and decide whether the
+    hyperparameter search and retraining need to run.
     """
-    merge_features(feature_dir, output_name=output_name)
+    monitoring = load_config(config_path).get("monitoring")
+    report = check_drift(feature_dir, os.path.join(param_dir, REFERENCE_STATS_NAME), monitoring, run_date=date)
+    has_params = os.path.exists(os.path.join(param_dir, "best_params.json"))
+    decision = decide_retraining(report, monitoring, has_params=has_params, force=force)
+
+    logger = get_run_logger()
+    logger.info(f"[DRIFT] Rows per day: {report['daily_rows']}, PSI: {report['psi']}")
+    if report["missing_days"]:
+        logger.warning(f"[ALERT] No daily features for {report['missing_days']}")
+    if report["low_volume_days"]:
+        logger.warning(f"[ALERT] Low data volume on {report['low_volume_days']}")
+    logger.info(f"[DRIFT] search={decision['run_search']}, train={decision['run_train']} ({decision['reason']})")
+    return decision
 
 @task
 def search_best_params_task(
@@ -59,7 +93,9 @@ def search_best_params_task(
     """
     config = load_config(config_path)
     n_trials = config.get("n_trials", 30)
-    auc = search_best_params(features_path, n_trials, model_dir, param_dir)
+    use_text = config.get("use_text_features", False)
+    window = config.get("training_window")
+    auc = search_best_params(features_path, n_trials, model_dir, param_dir, use_text=use_text, window=window)
     logger = get_run_logger()
     if auc < auc_alert_threshold:
         logger.error(f"[ALERT] Best AUC dropped below threshold! Current: {auc}")
@@ -72,13 +108,19 @@ def search_best_params_task(
 def train_xgboost_task(
     features_path=os.path.join(DATA_DIR, "features/issues_features_full_plus_increment.parquet"),
     params_path=os.path.join(DATA_DIR, "params/best_params.json"),
-    model_out=os.path.join(MODEL_DIR, "latest_model.json")
+    model_out=os.path.join(MODEL_DIR, "latest_model.json"),
+    config_path=CONFIG_PATH
 ):
     """
     Train the XGBoost model and save both the latest and historical models. 
     Returns training accuracy/AUC for logging reference.
     """
-    acc = train_xgboost(features_path, params_path, model_out)
+    config = load_config(config_path)
+    acc = train_xgboost(
+        features_path, params_path, model_out,
+        use_text=config.get("use_text_features", False),
+        window=config.get("training_window")
+    )
     logger = get_run_logger()
     logger.info(f"[MODEL] Train accuracy: {acc:.4f}")
 
@@ -94,16 +136,24 @@ def upload_model_to_s3_task(
     upload_model_to_s3(local_model_file, bucket_name, s3_key, with_history)
 
 @flow
-def main_flow(date=None, flow_latency_threshold=900):  
+def main_flow(date=None, flow_latency_threshold=900, force_retrain=False):  
     logger = get_run_logger()
     start = time.time()
+    # Created here rather than at import so importing the flow has no side effects
+    os.makedirs(FEATURE_DIR, exist_ok=True)
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    os.makedirs(PARAM_DIR, exist_ok=True)
 
     fetch_closed_issues_task(date)
     generate_features_task(date)
+    compact_daily_files_task()
     merge_features_task()
-    search_best_params_task()
-    train_xgboost_task()
-    upload_model_to_s3_task()
+    decision = check_drift_task(date, force=force_retrain)
+    if decision["run_search"]:
+        search_best_params_task()
+    if decision["run_train"]:
+        train_xgboost_task()
+        upload_model_to_s3_task()
 
     duration = time.time() - start
     logger.info(f"[FLOW-TIMING] main_flow total duration: {duration:.2f} seconds")
@@ -0,0 +1,42 @@
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+HEAVY_MODULES = ["pandas", "pyarrow", "numpy", "scipy", "sklearn", "github", "optuna", "xgboost", "boto3", "prefect"]
+
+# Startup paths worth keeping fast: the utils modules and the CLI itself
+TARGETS = {
+    "import utils.s3_utils": "import utils.s3_utils",
+    "import utils.data_utils": "import utils.data_utils",
+    "import utils.model_utils": "import utils.model_utils",
+    "import utils.cli": "import utils.cli",
+    "issue-copilot --help": "import sys; from utils.cli import main; sys.argv = ['issue-copilot', '--help']\ntry:\n    main()\nexcept SystemExit:\n    pass",
+}
+
+def time_snippet(code, repeat):
+    """
+    Best-of-N wall time of a fresh interpreter running code, plus the heavy modules it loaded.
+    """
+    probe = f"{code}\nimport sys, json\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    best = None
+    loaded = []
+    for _ in range(repeat):
+        start = time.time()
+        out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+        loaded = json.loads(out.strip().splitlines()[-1])
+    return best, loaded
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure interpreter startup + import time of the CLI entry points")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per target (best time is reported)")
+    args = parser.parse_args()
+
+    baseline, _ = time_snippet("pass", args.repeat)
+    print(json.dumps({"target": "python -c pass", "seconds": round(baseline, 3)}))
+    for name, code in TARGETS.items():
+        seconds, loaded = time_snippet(code, args.repeat)
+        print(json.dumps({"target": name, "seconds": round(seconds, 3), "heavy_modules_loaded": loaded}))
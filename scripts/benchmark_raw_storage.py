@@ -0,0 +1,64 @@
+import os
+import time
+import json
+import shutil
+import tempfile
+import argparse
+from dotenv import load_dotenv
+from utils.data_utils import write_raw_issues, load_raw_issues, raw_body_path, raw_input_columns, FULL_ROW_GROUP_SIZE
+
+load_dotenv()
+DATA_DIR = os.getenv("DATA_BASE_DIR", "./data")
+DEFAULT_RAW_PATH = os.path.join(DATA_DIR, "issues_closed_full.parquet")
+
+# None = pandas defaults (snappy, dictionary on every column), i.e. the previous layout
+VARIANTS = {
+    "pandas-default": None,
+    "zstd-3": {"compression_level": 3},
+    "zstd-6": {"compression_level": 6},
+    "zstd-12": {"compression_level": 12},
+    "zstd-6+split-body": {"compression_level": 6, "split_body": True},
+}
+
+def timed_read(raw_path, columns=None, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        load_raw_issues(raw_path, columns)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare on-disk size and read time of raw issue storage layouts")
+    parser.add_argument("--raw", type=str, default=DEFAULT_RAW_PATH, help="Raw issues parquet to rewrite")
+    args = parser.parse_args()
+
+    df = load_raw_issues(args.raw)
+    # What feature generation reads without / with text features
+    meta_inputs = raw_input_columns()
+    text_inputs = raw_input_columns(text_features=True)
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        for name, options in VARIANTS.items():
+            path = os.path.join(tmp_dir, f"{name}.parquet")
+            start = time.time()
+            if options is None:
+                df.to_parquet(path, index=False, row_group_size=FULL_ROW_GROUP_SIZE)
+            else:
+                write_raw_issues(df, path, options, row_group_size=FULL_ROW_GROUP_SIZE)
+            write_seconds = time.time() - start
+
+            size = os.path.getsize(path)
+            if os.path.exists(raw_body_path(path)):
+                size += os.path.getsize(raw_body_path(path))
+            print(json.dumps({
+                "variant": name,
+                "size_mb": round(size / 1024 ** 2, 2),
+                "write_seconds": round(write_seconds, 3),
+                "read_all_seconds": round(timed_read(path), 3),
+                "read_meta_inputs_seconds": round(timed_read(path, meta_inputs), 3),
+                "read_text_inputs_seconds": round(timed_read(path, text_inputs), 3),
+            }))
+    finally:
+        shutil.rmtree(tmp_dir)
@@ -0,0 +1,74 @@
+import os
+import time
+import json
+import resource
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+DATA_DIR = os.getenv("DATA_BASE_DIR", "./data")
+DEFAULT_FEATURES_PATH = os.path.join(DATA_DIR, "features", "issues_features_full_plus_increment.parquet")
+DEFAULT_PARAMS = {
+    "objective": "binary:logistic",
+    "eval_metric": "auc",
+    "tree_method": "hist",
+    "learning_rate": 0.1,
+    "max_depth": 6,
+    "seed": 42,
+}
+
+def matrix_nbytes(X):
+    # CSR: values + column indices + row pointers; DataFrame: column buffers
+    if hasattr(X, "nnz"):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return int(X.memory_usage(index=False, deep=True).sum())
+
+def run_variant(features_path, use_text, num_boost_round):
+    """
+    Load one feature set and run 3-fold CV with fixed params.
+    Runs in its own process so the reported peak RSS belongs to this variant only.
+    """
+    import xgboost as xgb
+    from utils.model_utils import load_data
+
+    start = time.time()
+    X, y, _ = load_data(features_path, use_text=use_text)
+    load_seconds = time.time() - start
+
+    start = time.time()
+    cv_results = xgb.cv(
+        DEFAULT_PARAMS,
+        xgb.DMatrix(X, label=y),
+        num_boost_round=num_boost_round,
+        nfold=3,
+        stratified=True,
+        metrics="auc",
+        seed=42,
+    )
+    train_seconds = time.time() - start
+
+    return {
+        "variant": "meta+text" if use_text else "meta",
+        "shape": list(X.shape),
+        "matrix_mb": round(matrix_nbytes(X) / 1024 ** 2, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2),
+        "load_seconds": round(load_seconds, 2),
+        "cv_seconds": round(train_seconds, 2),
+        "cv_auc": round(float(cv_results["test-auc-mean"].iloc[-1]), 4),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare memory and training time of meta features vs. meta + hashed text features")
+    parser.add_argument("--features", type=str, default=DEFAULT_FEATURES_PATH, help="Features parquet (its *_text.npz must exist)")
+    parser.add_argument("--rounds", type=int, default=200, help="Boosting rounds per CV run")
+    args = parser.parse_args()
+
+    results = []
+    for use_text in (False, True):
+        # max_workers=1 + a fresh pool per variant: each run gets a clean process
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results.append(executor.submit(run_variant, args.features, use_text, args.rounds).result())
+
+    for r in results:
+        print(json.dumps(r))
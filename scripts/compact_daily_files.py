@@ -0,0 +1,6 @@
+import sys
+from utils.cli import main
+
+# Same as: issue-copilot compact [args]
+if __name__ == "__main__":
+    main(["compact", *sys.argv[1:]])
@@ -18,5 +18,10 @@ setup(
         "pytest",
         "prefect"
     ],
-    python_requires=">=3.7",  
+    python_requires=">=3.9",
+    entry_points={
+        "console_scripts": [
+            "issue-copilot=utils.cli:main",
+        ],
+    },
 )
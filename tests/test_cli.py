@@ -0,0 +1,45 @@
+import os
+import boto3
+import pytest
+from moto import mock_s3
+
+from utils import cli
+
+BUCKET_NAME = "test-bucket"
+
+def test_parser_subcommands():
+    args = cli.build_parser().parse_args(["features", "--mode", "full", "--chunked", "--workers", "2"])
+    assert args.func is cli.features
+    assert args.chunked and args.workers == 2
+    with pytest.raises(SystemExit):
+        cli.build_parser().parse_args([])
+
+def test_text_option_resolution():
+    config = {"use_text_features": True}
+    for command in ["features", "search", "train"]:
+        args = cli.build_parser().parse_args([command])
+        assert cli._use_text(args, config) is True
+        assert cli._use_text(args, {}) is False
+        args = cli.build_parser().parse_args([command, "--no-text"])
+        assert cli._use_text(args, config) is False
+        args = cli.build_parser().parse_args([command, "--text"])
+        assert cli._use_text(args, {}) is True
+
+def test_download_subcommand(tmp_path, monkeypatch):
+    monkeypatch.setenv("MODEL_BUCKET", BUCKET_NAME)
+    monkeypatch.setenv("MODEL_DIR", str(tmp_path))
+    with mock_s3():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=BUCKET_NAME)
+        s3.put_object(Bucket=BUCKET_NAME, Key=cli.MODEL_S3_KEY, Body=b"hello model")
+        cli.main(["download"])
+    with open(os.path.join(tmp_path, "latest_model.json")) as f:
+        assert f.read() == "hello model"
+
+def test_default_train_features_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_BASE_DIR", str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        cli.default_train_features_path()
+    os.makedirs(tmp_path / "features")
+    (tmp_path / "features" / "issues_features_full.parquet").touch()
+    assert cli.default_train_features_path().endswith("issues_features_full.parquet")
@@ -1,6 +1,7 @@
 import os
 import pandas as pd
 import pytest
+import scipy.sparse as sp
 
 from utils import data_utils
 
@@ -79,3 +80,211 @@ def test_merge_features(tmp_path, mock_raw_parquet):
 
     # The result should contain 3 unique 'number' values
     assert set(merged_df["number"]) == {1, 2, 3}
+
+def test_generate_features_chunked_matches_single_pass(tmp_path, mock_raw_parquet):
+    # A single row group (pandas default) must still be split into several chunks
+    chunked_raw = tmp_path / "issues_closed_chunked.parquet"
+    pd.read_parquet(mock_raw_parquet).to_parquet(chunked_raw)
+
+    single_path = tmp_path / "single.parquet"
+    chunked_path = tmp_path / "chunked.parquet"
+    data_utils.generate_features(str(chunked_raw), str(single_path))
+    data_utils.generate_features_chunked(str(chunked_raw), str(chunked_path), n_workers=2, chunk_rows=1)
+
+    single_df = pd.read_parquet(single_path)
+    chunked_df = pd.read_parquet(chunked_path)
+    assert list(chunked_df["number"]) == [1, 2]
+    assert data_utils.read_feature_versions(str(chunked_path)) == data_utils.current_feature_versions()
+    pd.testing.assert_frame_equal(single_df, chunked_df, check_dtype=False)
+
+def test_generate_features_with_text(tmp_path, mock_raw_parquet):
+    out_path = tmp_path / "issues_features_full.parquet"
+    data_utils.generate_features(str(mock_raw_parquet), str(out_path), text_features=True)
+
+    text = sp.load_npz(data_utils.text_features_path(str(out_path)))
+    assert text.shape == (2, data_utils.TEXT_HASH_N_FEATURES)
+    # Row 1 has title and body, row 2 only a title
+    assert text[0].nnz > text[1].nnz > 0
+
+def test_merge_features_keeps_text_aligned(tmp_path, mock_raw_parquet):
+    out_dir = tmp_path / "features"
+    os.makedirs(out_dir, exist_ok=True)
+    full_path = out_dir / "issues_features_full.parquet"
+    data_utils.generate_features(str(mock_raw_parquet), str(full_path), text_features=True)
+    full_text = sp.load_npz(data_utils.text_features_path(str(full_path)))
+
+    # Incremental file: issue 2 again (duplicate) and a new issue 3 reusing row 1's text
+    inc_path = out_dir / "issues_features_2024-05-03.parquet"
+    feats_df = pd.read_parquet(full_path)
+    feats_df["number"] = [3, 2]
+    feats_df.to_parquet(inc_path)
+    sp.save_npz(data_utils.text_features_path(str(inc_path)), full_text)
+
+    data_utils.merge_features(str(out_dir), output_name="merged.parquet")
+    merged_df = pd.read_parquet(out_dir / "merged.parquet")
+    merged_text = sp.load_npz(data_utils.text_features_path(str(out_dir / "merged.parquet")))
+
+    assert list(merged_df["number"]) == [1, 2, 3]
+    assert merged_text.shape[0] == 3
+    assert (merged_text[2] != full_text[0]).nnz == 0
+
+def test_merge_features_applies_training_window(tmp_path, mock_raw_parquet):
+    out_dir = tmp_path / "features"
+    os.makedirs(out_dir, exist_ok=True)
+    # Full file closes on 2024-05-03 and 2024-05-15, one row per row group
+    full_path = out_dir / "issues_features_full.parquet"
+    data_utils.generate_features(str(mock_raw_parquet), str(full_path), text_features=True)
+    full_text = sp.load_npz(data_utils.text_features_path(str(full_path)))
+    pd.read_parquet(full_path).to_parquet(full_path, row_group_size=1)
+
+    inc_path = out_dir / "issues_features_2024-06-01.parquet"
+    feats_df = pd.read_parquet(full_path).iloc[[0]]
+    feats_df["number"] = 3
+    feats_df["closed_at"] = pd.Timestamp("2024-06-01T12:00:00Z")
+    feats_df.to_parquet(inc_path)
+    sp.save_npz(data_utils.text_features_path(str(inc_path)), full_text[[0]])
+
+    # 2024-05-03 is more than 20 days before 2024-06-01, 2024-05-15 is not
+    data_utils.merge_features(str(out_dir), output_name="merged.parquet", window={"max_days": 20, "half_life_days": 10})
+    merged_df = pd.read_parquet(out_dir / "merged.parquet")
+    merged_text = sp.load_npz(data_utils.text_features_path(str(out_dir / "merged.parquet")))
+    assert list(merged_df["number"]) == [2, 3]
+    assert (merged_text[0] != full_text[1]).nnz == 0
+
+    data_utils.merge_features(str(out_dir), output_name="merged.parquet", window={"max_rows": 1})
+    assert list(pd.read_parquet(out_dir / "merged.parquet")["number"]) == [3]
+    # The full file lies entirely outside the window and is not read at all
+    groups = data_utils._row_groups_in_window([str(full_path), str(inc_path)], max_rows=1)
+    assert groups[str(full_path)][0] == []
+
+def test_label_features_from_parquet(tmp_path, mock_raw_parquet):
+    # Labels come back from Parquet as numpy arrays, not lists
+    out_path = tmp_path / "features.parquet"
+    data_utils.generate_features(str(mock_raw_parquet), str(out_path))
+    feats_df = pd.read_parquet(out_path)
+    assert list(feats_df["num_labels"]) == [1, 1]
+    assert list(feats_df["has_bug_label"]) == [1, 0]
+    assert data_utils.read_feature_versions(str(out_path)) == data_utils.current_feature_versions()
+
+def test_update_feature_file_recomputes_only_outdated(tmp_path, mock_raw_parquet):
+    out_path = tmp_path / "features.parquet"
+    data_utils.generate_features(str(mock_raw_parquet), str(out_path))
+
+    # Simulate an old file: num_labels written by version 1, plus a sentinel in an up-to-date column
+    feats_df = pd.read_parquet(out_path)
+    feats_df["num_labels"] = 0
+    feats_df["title_len"] = -1
+    versions = data_utils.current_feature_versions()
+    versions["num_labels"] = 1
+    data_utils.write_feature_file(feats_df, str(out_path), versions)
+
+    data_utils.update_feature_file(str(mock_raw_parquet), str(out_path))
+    updated = pd.read_parquet(out_path)
+    assert list(updated["num_labels"]) == [1, 1]
+    assert list(updated["title_len"]) == [-1, -1]
+    assert list(updated["number"]) == [1, 2]
+    assert data_utils.read_feature_versions(str(out_path)) == data_utils.current_feature_versions()
+
+def test_update_feature_file_rebuilds_misaligned_rows(tmp_path, mock_raw_parquet):
+    out_path = tmp_path / "features.parquet"
+    data_utils.generate_features(str(mock_raw_parquet), str(out_path))
+
+    # A feature file whose rows no longer match its raw file (duplicate issue number)
+    feats_df = pd.read_parquet(out_path)
+    feats_df = pd.concat([feats_df, feats_df.iloc[[0]]], ignore_index=True)
+    versions = data_utils.current_feature_versions()
+    versions["num_labels"] = 1
+    data_utils.write_feature_file(feats_df, str(out_path), versions)
+
+    data_utils.update_feature_file(str(mock_raw_parquet), str(out_path))
+    updated = pd.read_parquet(out_path)
+    assert list(updated["number"]) == [1, 2]
+    assert list(updated["num_labels"]) == [1, 1]
+
+def test_regenerate_features_skips_empty_days(tmp_path, mock_raw_parquet):
+    raw_dir = tmp_path / "raw"
+    feature_dir = tmp_path / "features"
+    os.makedirs(raw_dir)
+    os.makedirs(feature_dir)
+    pd.read_parquet(mock_raw_parquet).to_parquet(raw_dir / "issues_closed_full.parquet")
+    # fetch_closed_issues writes a file with no columns for a day without closed issues
+    data_utils.write_raw_issues(pd.DataFrame([]), str(raw_dir / "issues_closed_2024-06-01.parquet"))
+    pd.read_parquet(mock_raw_parquet).iloc[[1]].to_parquet(raw_dir / "issues_closed_2024-06-02.parquet")
+
+    data_utils.regenerate_features(str(raw_dir), str(feature_dir), n_workers=1)
+    assert not os.path.exists(feature_dir / "issues_features_2024-06-01.parquet")
+    assert list(pd.read_parquet(feature_dir / "issues_features_2024-06-02.parquet")["number"]) == [2]
+
+    # The full file is updated through the chunked path
+    full_path = feature_dir / "issues_features_full.parquet"
+    feats_df = pd.read_parquet(full_path)
+    feats_df["num_labels"] = 0
+    versions = data_utils.current_feature_versions()
+    versions["num_labels"] = 1
+    data_utils.write_feature_file(feats_df, str(full_path), versions)
+    data_utils.regenerate_features(str(raw_dir), str(feature_dir), n_workers=1)
+    assert list(pd.read_parquet(full_path)["num_labels"]) == [1, 1]
+    assert data_utils.read_feature_versions(str(full_path)) == data_utils.current_feature_versions()
+
+@pytest.mark.parametrize("compression", ["snappy", "none", "gzip"])
+def test_write_raw_issues_other_codecs(tmp_path, mock_raw_parquet, compression):
+    # compression_level stays at its default of 6; codecs without levels must ignore it
+    raw_path = tmp_path / "issues_closed_2024-05-03.parquet"
+    data_utils.write_raw_issues(pd.read_parquet(mock_raw_parquet), str(raw_path), {"compression": compression})
+    assert list(data_utils.load_raw_issues(str(raw_path))["number"]) == [1, 2]
+
+def test_write_raw_issues_split_body(tmp_path, mock_raw_parquet):
+    raw_df = pd.read_parquet(mock_raw_parquet)
+    raw_df["user"] = ["alice", "alice"]
+    raw_path = tmp_path / "issues_closed_full.parquet"
+    data_utils.write_raw_issues(raw_df, str(raw_path), {"split_body": True}, row_group_size=1)
+
+    assert os.path.exists(data_utils.raw_body_path(str(raw_path)))
+    assert "body" not in pd.read_parquet(raw_path).columns
+    no_body = data_utils.load_raw_issues(str(raw_path), ["number", "user"])
+    assert list(no_body.columns) == ["number", "user"]
+    assert str(no_body["user"].dtype) == "category"
+    full = data_utils.load_raw_issues(str(raw_path))
+    assert list(full["body"]) == ["first bug", ""]
+
+    # Features computed from the split layout match the single-file layout
+    expected_path = tmp_path / "expected.parquet"
+    data_utils.generate_features(str(mock_raw_parquet), str(expected_path))
+    split_path = tmp_path / "split.parquet"
+    chunked_path = tmp_path / "chunked.parquet"
+    data_utils.generate_features(str(raw_path), str(split_path))
+    data_utils.generate_features_chunked(str(raw_path), str(chunked_path), n_workers=1, chunk_rows=1)
+    expected = pd.read_parquet(expected_path)
+    pd.testing.assert_frame_equal(expected, pd.read_parquet(split_path))
+    pd.testing.assert_frame_equal(expected, pd.read_parquet(chunked_path), check_dtype=False)
+
+    # body_len lives in the main file: meta features never open the body sidecar
+    assert list(pd.read_parquet(raw_path, columns=["body_len"])["body_len"]) == [9, 0]
+    os.rename(data_utils.raw_body_path(str(raw_path)), tmp_path / "moved_body.parquet")
+    for path in (split_path, chunked_path):
+        os.remove(path)
+    data_utils.generate_features(str(raw_path), str(split_path))
+    data_utils.generate_features_chunked(str(raw_path), str(chunked_path), n_workers=1, chunk_rows=1)
+    pd.testing.assert_frame_equal(expected, pd.read_parquet(split_path))
+    pd.testing.assert_frame_equal(expected, pd.read_parquet(chunked_path), check_dtype=False)
+
+def test_compact_daily_files(tmp_path, mock_raw_parquet):
+    raw_dir = tmp_path / "raw"
+    feature_dir = tmp_path / "features"
+    os.makedirs(raw_dir)
+    os.makedirs(feature_dir)
+    raw_df = pd.read_parquet(mock_raw_parquet)
+    for day, rows in (("2024-05-01", raw_df.iloc[:1]), ("2024-05-02", raw_df.iloc[1:]), ("2024-06-01", raw_df.iloc[1:])):
+        raw_path = raw_dir / f"issues_closed_{day}.parquet"
+        data_utils.write_raw_issues(rows, str(raw_path))
+        data_utils.generate_features(str(raw_path), str(feature_dir / f"issues_features_{day}.parquet"))
+
+    data_utils.compact_daily_files(str(raw_dir), str(feature_dir), compact_after_days=3, today=pd.Timestamp("2024-06-05").date())
+
+    # May is compacted, June is still within compact_after_days
+    assert sorted(os.listdir(raw_dir)) == ["issues_closed_2024-05.parquet", "issues_closed_2024-06-01.parquet"]
+    assert sorted(os.listdir(feature_dir)) == ["issues_features_2024-05.parquet", "issues_features_2024-06-01.parquet"]
+    monthly = pd.read_parquet(feature_dir / "issues_features_2024-05.parquet")
+    assert list(monthly["number"]) == [1, 2]
+    assert data_utils.read_feature_versions(str(feature_dir / "issues_features_2024-05.parquet")) == data_utils.current_feature_versions()
+    assert len(data_utils.load_raw_issues(str(raw_dir / "issues_closed_2024-05.parquet"))) == 2
@@ -2,8 +2,11 @@ import os
 import json
 import pandas as pd
 import pytest
+import scipy.sparse as sp
+import xgboost as xgb
 
 from utils import model_utils
+from utils.data_utils import text_features_path
 
 @pytest.fixture
 def mock_features_parquet(tmp_path):
@@ -71,3 +74,62 @@ def test_search_best_params(tmp_path, mock_features_parquet):
     assert (param_dir / "best_params.json").exists()
     snap_files = list(param_dir.glob("best_params_*.json"))
     assert len(snap_files) > 0
+    # Reference distribution for drift monitoring
+    assert (param_dir / "reference_stats.json").exists()
+
+def test_train_xgboost_with_text(tmp_path, mock_features_parquet, mock_params_json):
+    # Random sparse text matrix aligned with the 6 feature rows
+    text = sp.random(6, 1000, density=0.01, format="csr", random_state=0, dtype="float32")
+    sp.save_npz(text_features_path(mock_features_parquet), text)
+
+    X, _, _ = model_utils.load_data(mock_features_parquet, use_text=True)
+    assert sp.issparse(X)
+    assert X.shape == (6, 6 + 1000)
+    # Zero-valued meta features (has_bug_label, comments) are stored, not missing
+    assert X[:, :6].nnz == 6 * 6
+    assert xgb.DMatrix(X).num_nonmissing() == 6 * 6 + text.nnz
+
+    model_out = str(tmp_path / "model.json")
+    model_utils.train_xgboost(
+        features_path=mock_features_parquet,
+        params_path=mock_params_json,
+        model_out=model_out,
+        use_text=True
+    )
+    assert os.path.exists(model_out)
+
+def test_apply_training_window():
+    df = pd.DataFrame({
+        "title_len": [1, 2, 3, 4],
+        "closed_within_7_days": [0, 1, 0, 1],
+        "number": [1, 2, 3, 4],
+        "closed_at": pd.to_datetime(["2024-01-01", "2024-03-01", "2024-03-25", "2024-03-31"], utc=True),
+    }, index=[7, 5, 3, 1])
+    # The mask is positional, whatever the index labels are
+    keep, weights = model_utils.apply_training_window(df, {"max_days": 30})
+    assert list(keep) == [False, True, True, True]
+    assert weights is None
+
+    keep, _ = model_utils.apply_training_window(df, {"max_rows": 2})
+    assert list(df["number"][keep]) == [3, 4]
+
+    keep, weights = model_utils.apply_training_window(df, {"max_days": 30, "half_life_days": 30})
+    assert len(weights) == keep.sum()
+    assert weights[-1] == 1.0
+    assert weights[0] == pytest.approx(0.5)
+
+    # No window configured: all rows, no weights
+    keep, weights = model_utils.apply_training_window(df, None)
+    assert keep.all() and len(keep) == 4 and weights is None
+
+def test_load_data_window_selects_text_rows(tmp_path, mock_features_parquet):
+    df = pd.read_parquet(mock_features_parquet)
+    df["closed_at"] = pd.to_datetime(["2024-01-01", "2024-03-01", "2024-03-02", "2024-03-03", "2024-03-04", "2024-03-05"], utc=True)
+    df.to_parquet(mock_features_parquet)
+    # Text row i holds the value i + 1 in column i, so selected rows are easy to check
+    sp.save_npz(text_features_path(mock_features_parquet), sp.diags([1, 2, 3, 4, 5, 6], format="csr", dtype="float32"))
+
+    X, y, _ = model_utils.load_data(mock_features_parquet, use_text=True, window={"max_days": 30})
+    assert X.shape == (5, 6 + 6)
+    assert list(X[:, 6:].toarray().sum(axis=1)) == [2, 3, 4, 5, 6]
+    assert len(y) == 5
@@ -0,0 +1,78 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from utils import monitor_utils
+from utils.data_utils import feature_stats_path, write_feature_file
+
+def make_features(seed, n=500, body_scale=300.0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "title_len": rng.integers(5, 80, n),
+        "body_len": rng.exponential(body_scale, n).astype(int),
+        "hour_created": rng.integers(0, 24, n).astype(float),
+        "closed_within_7_days": rng.integers(0, 2, n),
+        "number": np.arange(n) + seed * n,
+    })
+
+def test_psi_same_vs_shifted_distribution():
+    reference = monitor_utils.sketch_frame(make_features(0))
+    same = monitor_utils.sketch_frame(make_features(1))
+    shifted = monitor_utils.sketch_frame(make_features(2, body_scale=3000.0))
+
+    assert "closed_within_7_days" not in reference["features"]
+    psi_same = monitor_utils.population_stability_index(reference["features"]["body_len"], same["features"]["body_len"])
+    psi_shifted = monitor_utils.population_stability_index(reference["features"]["body_len"], shifted["features"]["body_len"])
+    assert psi_same < 0.1
+    assert psi_shifted > 0.2
+
+def test_merge_stats_equals_stats_of_concatenation():
+    a, b = make_features(0, n=50), make_features(1, n=70)
+    merged = monitor_utils.merge_stats([monitor_utils.sketch_frame(a), monitor_utils.sketch_frame(b)])
+    assert merged == monitor_utils.sketch_frame(pd.concat([a, b], ignore_index=True))
+
+def test_check_drift_and_decision(tmp_path):
+    feature_dir = tmp_path / "features"
+    os.makedirs(feature_dir)
+    for i, day in enumerate(["2024-05-01", "2024-05-02"]):
+        write_feature_file(make_features(i + 1, body_scale=3000.0), str(feature_dir / f"issues_features_{day}.parquet"))
+    # Not a daily file: ignored by the drift check
+    write_feature_file(make_features(9), str(feature_dir / "issues_features_full.parquet"))
+
+    reference_path = tmp_path / monitor_utils.REFERENCE_STATS_NAME
+    report = monitor_utils.check_drift(str(feature_dir), str(reference_path), run_date="2024-05-02")
+    assert not report["has_reference"]
+    assert monitor_utils.decide_retraining(report)["run_search"]
+
+    reference_features = tmp_path / "reference.parquet"
+    write_feature_file(make_features(0), str(reference_features))
+    monitor_utils.save_reference_stats(str(reference_features), str(reference_path))
+
+    # Calendar days ending at the run date; 2024-05-03 has no daily file
+    report = monitor_utils.check_drift(str(feature_dir), str(reference_path), {"recent_days": 3}, run_date="2024-05-03")
+    assert report["days"] == ["2024-05-01", "2024-05-02", "2024-05-03"]
+    assert report["daily_rows"] == {"2024-05-01": 500, "2024-05-02": 500, "2024-05-03": 0}
+    assert report["missing_days"] == ["2024-05-03"]
+    assert report["low_volume_days"] == ["2024-05-03"]
+    assert report["drift"] and report["psi"]["body_len"] > 0.2
+    decision = monitor_utils.decide_retraining(report)
+    assert decision["run_search"] and decision["run_train"]
+
+    # Stats are cached next to each daily file
+    stats_path = feature_stats_path(str(feature_dir / "issues_features_2024-05-01.parquet"))
+    with open(stats_path) as f:
+        assert json.load(f)["rows"] == 500
+    assert not os.path.exists(feature_stats_path(str(feature_dir / "issues_features_full.parquet")))
+
+    # Without drift the search is skipped but the model is still retrained by default
+    no_drift = dict(report, drift=False)
+    decision = monitor_utils.decide_retraining(no_drift)
+    assert not decision["run_search"] and decision["run_train"]
+    assert monitor_utils.decide_retraining(no_drift, force=True)["run_search"]
+
+    # No daily files in the range: drift cannot be judged, so the search runs
+    report = monitor_utils.check_drift(str(feature_dir), str(reference_path), {"recent_days": 3}, run_date="2024-06-10")
+    assert report["missing_days"] == report["days"] and report["psi"] == {}
+    decision = monitor_utils.decide_retraining(report)
+    assert decision["run_search"] and decision["run_train"]
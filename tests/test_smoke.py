@@ -2,3 +2,18 @@ def test_import_utils():
     import utils.data_utils
     import utils.model_utils
     import utils.s3_utils
+    import utils.monitor_utils
+
+def test_imports_are_lazy():
+    # Importing the utils modules and the CLI must not pull in heavy dependencies
+    import sys
+    import json
+    import subprocess
+    heavy = ["pandas", "pyarrow", "github", "optuna", "xgboost", "boto3", "sklearn", "scipy"]
+    code = (
+        "import sys, json\n"
+        "import utils.cli, utils.data_utils, utils.model_utils, utils.monitor_utils, utils.s3_utils\n"
+        f"print(json.dumps([m for m in {heavy!r} if m in sys.modules]))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert json.loads(out) == []
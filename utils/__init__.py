@@ -0,0 +1,3 @@
+# Modules in this package import heavy dependencies (pandas, pyarrow, xgboost, optuna,
+# PyGithub, boto3, ...) inside the functions that use them, so importing them, e.g. from
+# the issue-copilot CLI, stays cheap.
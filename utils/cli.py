@@ -0,0 +1,205 @@
+# utils/cli.py
+
+"""
+issue-copilot command line entry point.
+
+Each subcommand imports its implementation inside its handler, so a small command
+such as `issue-copilot download` loads boto3 only, never pandas, xgboost, optuna or PyGithub.
+The scripts/*.py files are thin wrappers around the matching subcommand.
+"""
+
+import os
+import argparse
+
+MODEL_S3_KEY = "model/latest_model.json"
+
+def _data_dir():
+    return os.getenv("DATA_BASE_DIR", "./data")
+
+def _feature_dir():
+    return os.path.join(_data_dir(), "features")
+
+def _model_dir():
+    return os.getenv("MODEL_DIR", "./models")
+
+def _config_path():
+    return os.getenv("CONFIG_PATH", "config.json")
+
+def _use_text(args, config):
+    """
+    Text features are enabled by use_text_features in the config; --text / --no-text override it.
+    """
+    if args.text is not None:
+        return args.text
+    return config.get("use_text_features", False)
+
+def fetch(args):
+    from utils.data_utils import run_incremental, run_full_backfill
+    from utils.model_utils import load_config
+
+    github_token = os.getenv("GITHUB_TOKEN")
+    repo_name = os.getenv("REPO_NAME", "huggingface/transformers")
+    write_options = load_config(args.config).get("raw_storage")
+    if args.mode == "full":
+        run_full_backfill(github_token, repo_name, _data_dir(), write_options=write_options)
+    else:
+        run_incremental(github_token, repo_name, _data_dir(), args.date, write_options=write_options)
+
+def features(args):
+    from utils.data_utils import run_full_feature_generation, run_incremental_feature_generation, regenerate_features
+    from utils.model_utils import load_config
+
+    os.makedirs(_feature_dir(), exist_ok=True)
+    use_text = _use_text(args, load_config(args.config))
+    if args.mode == "regenerate":
+        regenerate_features(_data_dir(), _feature_dir(), text_features=use_text, n_workers=args.workers)
+    elif args.mode == "full":
+        run_full_feature_generation(_data_dir(), _feature_dir(), chunked=args.chunked, n_workers=args.workers, text_features=use_text)
+    else:
+        run_incremental_feature_generation(_data_dir(), _feature_dir(), args.date, text_features=use_text)
+
+def merge(args):
+    from utils.data_utils import merge_features
+    from utils.model_utils import load_config
+
+    os.makedirs(_feature_dir(), exist_ok=True)
+    window = load_config(args.config).get("training_window")
+    merge_features(_feature_dir(), "issues_features_full_plus_increment.parquet", window=window)
+
+def compact(args):
+    from utils.data_utils import compact_daily_files
+    from utils.model_utils import load_config
+
+    config = load_config(args.config)
+    compact_after_days = args.days if args.days is not None else config.get("compact_after_days", 31)
+    compact_daily_files(_data_dir(), _feature_dir(), compact_after_days, write_options=config.get("raw_storage"))
+
+def search(args):
+    from utils.model_utils import load_config, search_best_params
+
+    param_dir = os.path.join(_data_dir(), "params")
+    os.makedirs(_model_dir(), exist_ok=True)
+    os.makedirs(param_dir, exist_ok=True)
+    config = load_config(args.config)
+    n_trials = config.get("n_trials", 30)
+    use_text = _use_text(args, config)
+    window = config.get("training_window")
+
+    features_path = args.features or os.path.join(_feature_dir(), "issues_features_full.parquet")
+    search_best_params(features_path, n_trials, _model_dir(), param_dir, use_text=use_text, window=window)
+
+def default_train_features_path():
+    """
+    Merged features if present, otherwise the full features file.
+    """
+    default_path = os.path.join(_feature_dir(), "issues_features_full_plus_increment.parquet")
+    fallback_path = os.path.join(_feature_dir(), "issues_features_full.parquet")
+    if os.path.exists(default_path):
+        return default_path
+    if os.path.exists(fallback_path):
+        print(f"[WARN] {default_path} not found. Using {fallback_path} instead.")
+        return fallback_path
+    raise FileNotFoundError(f"Neither {default_path} nor {fallback_path} exists!")
+
+def train(args):
+    from utils.model_utils import load_config, train_xgboost
+
+    os.makedirs(_model_dir(), exist_ok=True)
+    config = load_config(args.config)
+    train_xgboost(
+        features_path=args.features or default_train_features_path(),
+        params_path=args.params or os.path.join(_data_dir(), "params", "best_params.json"),
+        model_out=args.output or os.path.join(_model_dir(), "latest_model.json"),
+        use_text=_use_text(args, config),
+        window=config.get("training_window")
+    )
+
+def drift(args):
+    import json
+    from utils.model_utils import load_config
+    from utils.monitor_utils import check_drift, decide_retraining, REFERENCE_STATS_NAME
+
+    param_dir = os.path.join(_data_dir(), "params")
+    monitoring = load_config(args.config).get("monitoring")
+    report = check_drift(_feature_dir(), os.path.join(param_dir, REFERENCE_STATS_NAME), monitoring, run_date=args.date)
+    has_params = os.path.exists(os.path.join(param_dir, "best_params.json"))
+    report["decision"] = decide_retraining(report, monitoring, has_params=has_params)
+    print(json.dumps(report, indent=2))
+
+def upload(args):
+    from utils.s3_utils import upload_model_to_s3
+
+    model_file = os.path.join(_model_dir(), "latest_model.json")
+    upload_model_to_s3(model_file, os.getenv("MODEL_BUCKET"), MODEL_S3_KEY, with_history=True)
+
+def download(args):
+    from utils.s3_utils import download_model_from_s3
+
+    # Serving hosts keep the model inside the mlops-serve checkout by default
+    model_dir = os.getenv("MODEL_DIR", "/home/ec2-user/mlops-serve/model")
+    download_model_from_s3(os.getenv("MODEL_BUCKET"), MODEL_S3_KEY, model_dir, "latest_model.json")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="issue-copilot", description="Issue-Copilot training pipeline")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("fetch", help="Fetch closed GitHub issues")
+    p.add_argument("--mode", choices=["full", "incremental"], default="incremental", help="Fetch full dataset or incremental update")
+    p.add_argument("--date", type=str, help="Target date in YYYY-MM-DD format (only used in incremental mode)")
+    p.add_argument("--config", type=str, default=_config_path(), help="Config JSON for raw_storage write options")
+    p.set_defaults(func=fetch)
+
+    p = subparsers.add_parser("features", help="Generate features from raw issues")
+    p.add_argument("--mode", choices=["full", "incremental", "regenerate"], default="incremental", help="Run mode (regenerate: recompute only missing/outdated feature columns of every file)")
+    p.add_argument("--date", type=str, help="Target date in YYYY-MM-DD format (only used in incremental mode)")
+    p.add_argument("--chunked", action="store_true", help="Process the raw file in chunks of rows in a process pool (only used in full mode)")
+    p.add_argument("--workers", type=int, default=None, help="Number of worker processes for --chunked and regenerate (default: CPU count)")
+    p.add_argument("--text", action=argparse.BooleanOptionalAction, default=None, help="Also write hashed title/body text features as a sparse matrix next to the Parquet output (overrides use_text_features in config)")
+    p.add_argument("--config", type=str, default=_config_path(), help="Config JSON for use_text_features")
+    p.set_defaults(func=features)
+
+    p = subparsers.add_parser("merge", help="Merge full and incremental feature files")
+    p.add_argument("--config", type=str, default=_config_path(), help="Config JSON for the training window")
+    p.set_defaults(func=merge)
+
+    p = subparsers.add_parser("compact", help="Fold daily raw/feature files of old months into monthly files")
+    p.add_argument("--config", type=str, default=_config_path(), help="Config JSON for compact_after_days and raw_storage")
+    p.add_argument("--days", type=int, default=None, help="Compact months older than this many days (overrides config)")
+    p.set_defaults(func=compact)
+
+    p = subparsers.add_parser("search", help="Search the best XGBoost params with Optuna")
+    p.add_argument("--features", type=str, default=None, help="Path to features parquet (default: features/issues_features_full.parquet)")
+    p.add_argument("--text", action=argparse.BooleanOptionalAction, default=None, help="Append the hashed text features stored next to the features file (overrides use_text_features in config)")
+    p.add_argument("--config", type=str, default=_config_path(), help="Config JSON for n_trials, use_text_features and the training window")
+    p.set_defaults(func=search)
+
+    p = subparsers.add_parser("train", help="Train the XGBoost model with the best params")
+    p.add_argument("--features", type=str, default=None, help="Features file (default: merged features, falling back to full features)")
+    p.add_argument("--params", type=str, default=None, help="Best params JSON (default: params/best_params.json)")
+    p.add_argument("--output", type=str, default=None, help="Output model file (default: $MODEL_DIR/latest_model.json)")
+    p.add_argument("--text", action=argparse.BooleanOptionalAction, default=None, help="Append the hashed text features stored next to the features file (overrides use_text_features in config)")
+    p.add_argument("--config", type=str, default=_config_path(), help="Config JSON for use_text_features and the training window")
+    p.set_defaults(func=train)
+
+    p = subparsers.add_parser("drift", help="Compare recent daily features with the training distribution (PSI)")
+    p.add_argument("--config", type=str, default=_config_path(), help="Config JSON for monitoring thresholds")
+    p.add_argument("--date", type=str, help="Last day of the compared range in YYYY-MM-DD format (default: yesterday)")
+    p.set_defaults(func=drift)
+
+    p = subparsers.add_parser("upload", help="Upload the latest model to S3")
+    p.set_defaults(func=upload)
+
+    p = subparsers.add_parser("download", help="Download the latest model from S3")
+    p.set_defaults(func=download)
+
+    return parser
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,146 @@
 # utils/data_utils.py
 
 import os
-import pandas as pd
-from github import Github
 from datetime import datetime, timedelta, timezone
 
 #fetch_closed_issues.py
 
-def fetch_closed_issues(github_token, repo_name, since=None, until=None, save_path=None):
+FULL_ROW_GROUP_SIZE = 2000
+
+# Raw Parquet write options; any key can be overridden via "raw_storage" in config.json.
+DEFAULT_RAW_WRITE_OPTIONS = {
+    "compression": "zstd",
+    "compression_level": 6,
+    # Low-cardinality columns; title/body are left plain since dictionaries never pay off there
+    "dictionary_columns": ["labels", "user", "state"],
+    # Write number + body to a sidecar file that is only read for text features
+    # (body_len is kept in the main file, so meta features never need the bodies)
+    "split_body": False,
+}
+
+def raw_body_path(raw_path):
+    """
+    Sidecar file holding number + body for raw files written with split_body.
+    """
+    return os.path.splitext(raw_path)[0] + "_body.parquet"
+
+def write_raw_issues(df, save_path, write_options=None, row_group_size=None):
+    """
+    Write raw issues to Parquet with the configured compression and dictionary encoding,
+    optionally moving bodies to a sidecar file with the same row groups.
+    A body_len column is stored next to the other columns whenever bodies are written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    options = {**DEFAULT_RAW_WRITE_OPTIONS, **(write_options or {})}
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if "body" in table.column_names:
+        table = _set_body_len(table)
+
+    use_dictionary = []
+    for name in options["dictionary_columns"]:
+        if name not in table.column_names:
+            continue
+        column = table.column(name)
+        if pa.types.is_list(column.type):
+            # Parquet dictionary-encodes the list items, not the list itself
+            use_dictionary.append(f"{name}.list.element")
+        elif not pa.types.is_null(column.type):
+            # An Arrow dictionary column reads back as a pandas category
+            table = table.set_column(table.schema.get_field_index(name), name, column.dictionary_encode())
+            use_dictionary.append(name)
+
+    write_kwargs = {
+        "compression": options["compression"],
+        "row_group_size": row_group_size,
+    }
+    if options["compression_level"] is not None and _codec_supports_level(options["compression"]):
+        write_kwargs["compression_level"] = options["compression_level"]
+    body_path = raw_body_path(save_path)
+    if options["split_body"] and "body" in table.column_names:
+        pq.write_table(table.select(["number", "body"]), body_path, use_dictionary=False, **write_kwargs)
+        table = table.drop_columns(["body"])
+    elif os.path.exists(body_path):
+        os.remove(body_path)
+    pq.write_table(table, save_path, use_dictionary=use_dictionary, **write_kwargs)
+
+def _codec_supports_level(compression):
+    # snappy and "none" reject compression_level; unknown codec names fail in write_table instead
+    import pyarrow as pa
+    if compression is None or str(compression).lower() in ("none", "uncompressed"):
+        return False
+    try:
+        return pa.Codec.supports_compression_level(compression)
+    except (ValueError, pa.ArrowInvalid):
+        return False
+
+def _body_lengths(body):
+    # Length of every body (0 when missing), as stored in the body_len raw column
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    if isinstance(body, (pa.Array, pa.ChunkedArray)):
+        body = body.cast(pa.string())
+    else:
+        body = pa.array(body, type=pa.string())
+    return pc.utf8_length(pc.fill_null(body, "")).cast(pa.int64())
+
+def _set_body_len(table):
+    # Add or refresh body_len from the body column of an Arrow table or record batch
+    lengths = _body_lengths(table.column("body"))
+    if "body_len" in table.schema.names:
+        return table.set_column(table.schema.get_field_index("body_len"), "body_len", lengths)
+    return table.append_column("body_len", lengths)
+
+def _plan_raw_read(raw_path, columns):
+    """
+    Columns to read from a raw file and whether body_len must be derived from body.
+    Files written before body_len was stored only have the bodies.
+    """
+    import pyarrow.parquet as pq
+    if columns is None or "body_len" not in columns or "body_len" in pq.read_schema(raw_path).names:
+        return columns, False
+    columns = [c for c in columns if c != "body_len"]
+    return columns + ([] if "body" in columns else ["body"]), True
+
+def load_raw_issues(raw_path, columns=None):
+    """
+    Read a raw issues file (all columns by default).
+    Bodies stored in a sidecar are only read when "body" is requested.
+    """
+    import pandas as pd
+    requested = columns
+    columns, derive_body_len = _plan_raw_read(raw_path, columns)
+    body_path = raw_body_path(raw_path)
+    split = os.path.exists(body_path)
+    want_body = columns is None or "body" in columns
+    if split and columns is not None:
+        columns = [c for c in columns if c != "body"]
+    df = pd.read_parquet(raw_path, columns=columns)
+    if split and want_body:
+        # Sidecar rows are written in the same order as the main file
+        df["body"] = pd.read_parquet(body_path, columns=["body"])["body"].values
+    if derive_body_len:
+        df["body_len"] = _body_lengths(df["body"]).to_numpy()
+        if "body" not in requested:
+            df = df.drop(columns=["body"])
+    return df
+
+def raw_issue_count(raw_path):
+    """
+    Number of issues in a raw file, read from the Parquet footer only.
+    Days without closed issues are written as files with no rows and no columns.
+    """
+    import pyarrow.parquet as pq
+    return pq.read_metadata(raw_path).num_rows
+
+def fetch_closed_issues(github_token, repo_name, since=None, until=None, save_path=None, row_group_size=None, write_options=None):
     """
     Fetch closed issues from a GitHub repository.
     Supports full extraction and time window filtering.
     Uses UTC timezone for all timestamps. Shows progress during fetch.
     """
+    import pandas as pd
+    from github import Github
     g = Github(github_token)
     repo = g.get_repo(repo_name)
 
@@ -44,11 +172,11 @@ def fetch_closed_issues(github_token, repo_name, since=None, until=None, save_pa
 
     df = pd.DataFrame(data)
     if save_path:
-        df.to_parquet(save_path, index=False)
+        write_raw_issues(df, save_path, write_options, row_group_size=row_group_size)
         print(f"Saved to {save_path}")
     return df
 
-def run_incremental(github_token, repo_name, data_dir, target_date=None):
+def run_incremental(github_token, repo_name, data_dir, target_date=None, write_options=None):
     os.makedirs(data_dir, exist_ok=True)
     if target_date is None:
         # Default to fetching yesterday's closed issues
@@ -63,92 +191,485 @@ def run_incremental(github_token, repo_name, data_dir, target_date=None):
         print(f"{out_file} already exists. Skipping fetch.")
         return
     print(f"Fetching closed issues from {since} to {until} ...")
-    df = fetch_closed_issues(github_token, repo_name, since=since, until=until, save_path=out_file)
+    df = fetch_closed_issues(github_token, repo_name, since=since, until=until, save_path=out_file, write_options=write_options)
     print(f"Number of issues fetched: {len(df)}")
 
-def run_full_backfill(github_token, repo_name, data_dir):
+def run_full_backfill(github_token, repo_name, data_dir, write_options=None):
     os.makedirs(data_dir, exist_ok=True)
     out_file = f"{data_dir}/issues_closed_full.parquet"
     if os.path.exists(out_file):
         print(f"{out_file} already exists. Skipping full fetch.")
         return
     print("Fetching all closed issues ...")
-    df = fetch_closed_issues(github_token, repo_name, save_path=out_file)
+    # Small row groups keep the streaming reads of generate_features_chunked light
+    df = fetch_closed_issues(github_token, repo_name, save_path=out_file, row_group_size=FULL_ROW_GROUP_SIZE, write_options=write_options)
     print(f"Number of issues fetched: {len(df)}")
 
 # generate_features.py
 
 import os
-import pandas as pd
+import json
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from tqdm import tqdm
 
-def extract_features(row):
+# Per-row helpers run once per issue, so they avoid pandas/numpy calls entirely.
+
+def _missing(value):
+    # None, NaN and NaT (NaN and NaT are the only values not equal to themselves)
+    return value is None or value != value
+
+def _text(value):
     # Fill missing text
-    body = row["body"] if pd.notna(row["body"]) else ""
-    title = row["title"] if pd.notna(row["title"]) else ""
-    labels = row["labels"] if isinstance(row["labels"], list) else []
+    return "" if _missing(value) else value
+
+def _labels(row):
+    # Parquet round-trips list columns as numpy arrays, not lists
+    labels = row["labels"]
+    return list(labels) if hasattr(labels, "__len__") and not isinstance(labels, str) else []
+
+def _title_len(row):
+    return len(_text(row["title"]))
+
+def _body_len(row):
+    # Raw files store body_len, so the bodies are only read for text features;
+    # rows built elsewhere (e.g. from the GitHub API) may only carry the body
+    if "body_len" in row:
+        return int(row["body_len"])
+    return len(_text(row["body"]))
+
+def _num_labels(row):
+    return len(_labels(row))
+
+def _has_bug_label(row):
+    return int("bug" in _labels(row))
+
+def _hour_created(row):
+    created_at = row["created_at"]
+    return None if _missing(created_at) else created_at.hour
+
+def _comments(row):
+    return row["comments"]
+
+def _closed_at(row):
+    return None if _missing(row["closed_at"]) else row["closed_at"]
+
+def _closed_within_7_days(row):
     created_at = row["created_at"]
     closed_at = row["closed_at"]
+    if _missing(closed_at) or _missing(created_at):
+        return 0
+    return int((closed_at - created_at) <= timedelta(days=7))
 
-    has_bug_label = int("bug" in labels)
-    closed_within_7_days = (
-        int((closed_at - created_at) <= timedelta(days=7))
-        if pd.notna(closed_at) and pd.notna(created_at) else 0
-    )
+# Feature registry: name -> (version, raw input columns, function of a raw row).
+# Bump a feature's version whenever its definition changes; regenerate_features then
+# recomputes only that column in every existing feature file.
+FEATURE_REGISTRY = {
+    "title_len": (1, ["title"], _title_len),
+    "body_len": (1, ["body_len"], _body_len),
+    # v2: labels read back from Parquet as arrays were counted as empty
+    "num_labels": (2, ["labels"], _num_labels),
+    "has_bug_label": (2, ["labels"], _has_bug_label),
+    "hour_created": (1, ["created_at"], _hour_created),
+    "comments": (1, ["comments"], _comments),
+    "closed_within_7_days": (1, ["created_at", "closed_at"], _closed_within_7_days),
+    # Not a model input: used to select the training window (see model_utils.apply_training_window)
+    "closed_at": (1, ["closed_at"], _closed_at),
+}
+FEATURE_VERSIONS_KEY = b"feature_versions"
 
-    return {
-        "title_len": len(title),
-        "body_len": len(body),
-        "num_labels": len(labels),
-        "has_bug_label": has_bug_label,
-        "hour_created": created_at.hour if not pd.isna(created_at) else None,
-        "comments": row["comments"],
-        "closed_within_7_days": closed_within_7_days
-    }
+def current_feature_versions():
+    return {name: spec[0] for name, spec in FEATURE_REGISTRY.items()}
+
+def extract_features(row, names=None):
+    names = FEATURE_REGISTRY if names is None else names
+    return {name: FEATURE_REGISTRY[name][2](row) for name in names}
 
-def generate_features(input_path, output_path):
+def build_feature_frame(df, show_progress=True, names=None):
+    """
+    Apply extract_features to every row of a raw issues frame and return the feature frame.
+    Only the registered features in names are computed (default: all of them).
+    """
+    import pandas as pd
+    from tqdm import tqdm
+    names = list(FEATURE_REGISTRY if names is None else names)
+    rows = df.iterrows()
+    if show_progress:
+        rows = tqdm(rows, total=len(df), desc="Generating features")
+    feature_rows = [extract_features(row, names) for _, row in rows]
+
+    feature_df = pd.DataFrame(feature_rows, columns=names)
+    if "number" in df.columns:
+        feature_df["number"] = df["number"].values
+    for col in ("closed_within_7_days", "has_bug_label"):
+        if col in feature_df.columns and not feature_df.empty:
+            feature_df[col] = feature_df[col].astype(int)
+    return feature_df
+
+def _with_feature_versions(schema, versions):
+    metadata = dict(schema.metadata or {})
+    metadata[FEATURE_VERSIONS_KEY] = json.dumps(versions, sort_keys=True).encode()
+    return schema.with_metadata(metadata)
+
+def raw_input_columns(names=None, text_features=False):
+    """
+    Raw columns needed to compute the given registered features (and optionally text features).
+    """
+    names = FEATURE_REGISTRY if names is None else names
+    columns = {"number"}
+    for name in names:
+        columns.update(FEATURE_REGISTRY[name][1])
+    if text_features:
+        columns.update(["title", "body"])
+    return sorted(columns)
+
+def write_feature_file(feature_df, output_path, versions=None):
+    """
+    Write a feature frame to Parquet, recording the feature versions it contains in the file metadata.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    versions = current_feature_versions() if versions is None else versions
+    table = pa.Table.from_pandas(feature_df, preserve_index=False)
+    table = table.replace_schema_metadata(_with_feature_versions(table.schema, versions).metadata)
+    pq.write_table(table, output_path)
+
+def read_feature_versions(feature_path):
+    """
+    Return {feature name: version} recorded in a feature file.
+    """
+    import pyarrow.parquet as pq
+    schema = pq.read_schema(feature_path)
+    metadata = schema.metadata or {}
+    if FEATURE_VERSIONS_KEY in metadata:
+        return json.loads(metadata[FEATURE_VERSIONS_KEY])
+    # Files written before the registry existed hold version 1 of every column they contain
+    return {name: 1 for name in schema.names if name in FEATURE_REGISTRY}
+
+# text features
+
+# Hashed bag-of-words / n-grams over title + body. The vectorizer is stateless, so
+# chunks, daily files and the serving side all map tokens to the same columns.
+# 2**16 columns keeps XGBoost's per-column histogram memory and time manageable.
+TEXT_HASH_N_FEATURES = 2 ** 16
+TEXT_NGRAM_RANGE = (1, 2)
+
+def text_features_path(feature_path):
+    """
+    Sparse text matrix stored alongside a feature Parquet file, in the same row order.
+    """
+    return os.path.splitext(feature_path)[0] + "_text.npz"
+
+def feature_stats_path(feature_path):
+    """
+    Per-file feature statistics (see utils/monitor_utils.py) stored alongside a feature Parquet file.
+    """
+    return os.path.splitext(feature_path)[0] + "_stats.json"
+
+def build_text_matrix(df):
+    """
+    Hash the title and body of every row into a CSR matrix of shape (len(df), TEXT_HASH_N_FEATURES).
+    """
+    import numpy as np
+    from sklearn.feature_extraction.text import HashingVectorizer
+    vectorizer = HashingVectorizer(
+        n_features=TEXT_HASH_N_FEATURES,
+        ngram_range=TEXT_NGRAM_RANGE,
+        alternate_sign=False,
+        norm="l2",
+        dtype=np.float32,
+    )
+    texts = (df["title"].fillna("") + "\n" + df["body"].fillna("")).tolist()
+    return vectorizer.transform(texts).tocsr()
+
+def generate_features(input_path, output_path, text_features=False):
+    import scipy.sparse as sp
     if not os.path.exists(input_path):
         print(f"[SKIP] Input file {input_path} does not exist.")
         return
-    if os.path.exists(output_path):
+    text_path = text_features_path(output_path)
+    need_features = not os.path.exists(output_path)
+    need_text = text_features and not os.path.exists(text_path)
+    if not need_features and not need_text:
         print(f"[SKIP] Output file {output_path} already exists.")
         return
+    if raw_issue_count(input_path) == 0:
+        print(f"[SKIP] Input file {input_path} has no rows.")
+        return
 
-    df = pd.read_parquet(input_path)
+    df = load_raw_issues(input_path, raw_input_columns(None if need_features else [], need_text))
 
-    feature_rows = []
-    print(f"[INFO] Extracting features from {len(df)} rows...")
-    for _, row in tqdm(df.iterrows(), total=len(df), desc="Generating features"):
-        feats = extract_features(row)
-        feature_rows.append(feats)
+    if need_features:
+        print(f"[INFO] Extracting features from {len(df)} rows...")
+        feature_df = build_feature_frame(df)
+        write_feature_file(feature_df, output_path)
+        print(f"[DONE] Saved features to {output_path}")
+        print(feature_df.head())
+    if need_text:
+        text = build_text_matrix(df)
+        sp.save_npz(text_path, text)
+        print(f"[DONE] Saved text features to {text_path}. Shape: {text.shape}, nnz: {text.nnz}")
 
-    feature_df = pd.DataFrame(feature_rows)
-    if "number" in df.columns:
-        feature_df["number"] = df["number"].values
-    feature_df["closed_within_7_days"] = feature_df["closed_within_7_days"].astype(int)
-    feature_df["has_bug_label"] = feature_df["has_bug_label"].astype(int)
-    feature_df.to_parquet(output_path, index=False)
-    print(f"[DONE] Saved features to {output_path}")
-    print(feature_df.head())
+# Rows per chunk sent to a worker by generate_features_chunked. Chunks are cut by row
+# ranges, so the split does not depend on how the raw file was written.
+FEATURE_CHUNK_ROWS = 2000
+
+def _features_for_chunk(args):
+    """
+    Worker: compute the features of one chunk of raw rows and return them as an Arrow table
+    plus its hashed text matrix (either is None when not requested or the chunk is empty).
+    names selects the features like in raw_input_columns: None for all, [] for none.
+    """
+    import pyarrow as pa
+    batch, names, with_text = args
+    df = batch.to_pandas()
+    if df.empty:
+        return None, None
+    table = None
+    if names is None or names:
+        feature_df = build_feature_frame(df, show_progress=False, names=names)
+        if "hour_created" in feature_df:
+            # A chunk may have no missing created_at at all; keep a stable float dtype
+            # so every output row group shares one schema.
+            feature_df["hour_created"] = feature_df["hour_created"].astype("float64")
+        table = pa.Table.from_pandas(feature_df, preserve_index=False)
+    text = build_text_matrix(df) if with_text else None
+    return table, text
+
+def _iter_raw_chunks(input_path, columns, chunk_rows):
+    """
+    Yield the raw file as record batches of at most chunk_rows rows, with body
+    taken from the sidecar file when the raw file was written with split_body.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    read_columns, derive_body_len = _plan_raw_read(input_path, columns)
+    body_path = raw_body_path(input_path)
+    split = "body" in read_columns and os.path.exists(body_path)
+    main_columns = [c for c in read_columns if c != "body"] if split else read_columns
+    batches = pq.ParquetFile(input_path).iter_batches(batch_size=chunk_rows, columns=main_columns)
+    if split:
+        batches = _with_sidecar_body(batches, input_path, body_path, chunk_rows)
+    for batch in batches:
+        if derive_body_len:
+            batch = _set_body_len(batch)
+            if "body" not in columns:
+                batch = batch.drop_columns(["body"])
+        yield batch
+
+def _with_sidecar_body(batches, input_path, body_path, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    # The sidecar is written with the same row groups as the main file, so batches line up
+    body_batches = pq.ParquetFile(body_path).iter_batches(batch_size=chunk_rows, columns=["body"])
+    for batch, body_batch in zip(batches, body_batches):
+        if batch.num_rows != body_batch.num_rows:
+            raise ValueError(f"{body_path} is not aligned with {input_path}")
+        yield pa.RecordBatch.from_arrays(
+            batch.columns + [body_batch.column(0)],
+            names=batch.schema.names + ["body"],
+        )
+
+def _iter_chunk_features(input_path, names=None, with_text=False, n_workers=None, chunk_rows=FEATURE_CHUNK_ROWS):
+    """
+    Stream the raw file in chunks of chunk_rows rows through a process pool and yield
+    (table, text) per chunk in row order. At most 2 * n_workers chunks are in flight,
+    so memory stays bounded regardless of file size.
+    """
+    from collections import deque
+    from tqdm import tqdm
+    n_workers = n_workers or os.cpu_count()
+    total_rows = raw_issue_count(input_path)
+    n_chunks = -(-total_rows // chunk_rows)
+    print(f"[INFO] Extracting features from {total_rows} rows in {n_chunks} chunks with {n_workers} workers...")
+    chunks = _iter_raw_chunks(input_path, raw_input_columns(names, with_text), chunk_rows)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor, tqdm(total=n_chunks, desc="Generating features") as progress:
+        in_flight = deque()
+        while True:
+            # Keep a bounded window of submitted chunks and collect them in submission order
+            for batch in chunks:
+                in_flight.append(executor.submit(_features_for_chunk, (batch, names, with_text)))
+                if len(in_flight) >= 2 * n_workers:
+                    break
+            if not in_flight:
+                break
+            result = in_flight.popleft().result()
+            progress.update(1)
+            yield result
+
+def generate_features_chunked(input_path, output_path, n_workers=None, text_features=False, chunk_rows=FEATURE_CHUNK_ROWS):
+    """
+    Chunked variant of generate_features for large raw files.
+    Chunks of chunk_rows rows are processed in worker processes and written as output
+    row groups in the original order.
+    """
+    import pyarrow.parquet as pq
+    import scipy.sparse as sp
+    if not os.path.exists(input_path):
+        print(f"[SKIP] Input file {input_path} does not exist.")
+        return
+    text_path = text_features_path(output_path)
+    need_features = not os.path.exists(output_path)
+    need_text = text_features and not os.path.exists(text_path)
+    if not need_features and not need_text:
+        print(f"[SKIP] Output file {output_path} already exists.")
+        return
+    if raw_issue_count(input_path) == 0:
+        print(f"[SKIP] Input file {input_path} has no rows.")
+        return
+
+    tmp_path = output_path + ".tmp"
+    writer = None
+    text_parts = []
+    n_rows = 0
+    try:
+        chunks = _iter_chunk_features(input_path, None if need_features else [], need_text, n_workers, chunk_rows)
+        for table, text in chunks:
+            if text is not None:
+                text_parts.append(text)
+            if table is None:
+                continue
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, _with_feature_versions(table.schema, current_feature_versions()))
+            writer.write_table(table.cast(writer.schema))
+            n_rows += table.num_rows
+    except Exception:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
-def run_full_feature_generation(raw_dir, feature_dir):
+    if writer is not None:
+        writer.close()
+        os.replace(tmp_path, output_path)
+        print(f"[DONE] Saved {n_rows} feature rows to {output_path}")
+    if need_text and text_parts:
+        text = sp.vstack(text_parts, format="csr")
+        sp.save_npz(text_path, text)
+        print(f"[DONE] Saved text features to {text_path}. Shape: {text.shape}, nnz: {text.nnz}")
+
+def run_full_feature_generation(raw_dir, feature_dir, chunked=False, n_workers=None, text_features=False):
     input_path = os.path.join(raw_dir, "issues_closed_full.parquet")
     output_path = os.path.join(feature_dir, "issues_features_full.parquet")
-    generate_features(input_path, output_path)
+    if chunked:
+        generate_features_chunked(input_path, output_path, n_workers, text_features=text_features)
+    else:
+        generate_features(input_path, output_path, text_features=text_features)
 
-def run_incremental_feature_generation(raw_dir, feature_dir, date_str=None):
+def run_incremental_feature_generation(raw_dir, feature_dir, date_str=None, text_features=False):
     if date_str is None:
         target_date = (datetime.utcnow() - timedelta(days=1)).date()
     else:
         target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
     input_path = os.path.join(raw_dir, f"issues_closed_{target_date}.parquet")
     output_path = os.path.join(feature_dir, f"issues_features_{target_date}.parquet")
-    generate_features(input_path, output_path)
+    generate_features(input_path, output_path, text_features=text_features)
+
+def update_feature_file(input_path, output_path, chunked=False, n_workers=None):
+    """
+    Bring an existing feature file up to date with FEATURE_REGISTRY: recompute only the
+    columns whose recorded version is missing or outdated, drop unregistered ones,
+    and rewrite the file in place. With chunked=True the stale columns are computed
+    through the same process pool as generate_features_chunked.
+    """
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    if not os.path.exists(input_path):
+        print(f"[SKIP] Input file {input_path} does not exist.")
+        return
+    if raw_issue_count(input_path) == 0:
+        print(f"[SKIP] Input file {input_path} has no rows.")
+        return
+    if not os.path.exists(output_path):
+        _rebuild_feature_file(input_path, output_path, chunked, n_workers)
+        return
+
+    versions = read_feature_versions(output_path)
+    current = current_feature_versions()
+    stale = [name for name in FEATURE_REGISTRY if versions.get(name) != current[name]]
+    removed = [name for name in versions if name not in FEATURE_REGISTRY]
+    if not stale and not removed:
+        print(f"[SKIP] {output_path} is up to date.")
+        return
+
+    print(f"[INFO] Updating {output_path}: recompute {stale}, drop {removed}")
+    feature_df = pd.read_parquet(output_path).drop(columns=stale + removed, errors="ignore")
+    if stale:
+        # Only read the raw columns the stale features depend on
+        if chunked:
+            tables = [table for table, _ in _iter_chunk_features(input_path, stale, n_workers=n_workers) if table is not None]
+            new_df = pa.concat_tables(tables).to_pandas()
+        else:
+            raw_df = load_raw_issues(input_path, raw_input_columns(stale))
+            new_df = build_feature_frame(raw_df, show_progress=False, names=stale)
+        # Feature files keep the row order of their raw file (and the text matrix relies on it),
+        # so new columns are assigned by position once the issue numbers are known to line up.
+        if len(new_df) != len(feature_df) or not np.array_equal(new_df["number"].to_numpy(), feature_df["number"].to_numpy()):
+            print(f"[WARN] Rows of {output_path} do not match {input_path}. Rebuilding it from scratch.")
+            _rebuild_feature_file(input_path, output_path, chunked, n_workers)
+            return
+        for name in stale:
+            feature_df[name] = new_df[name].to_numpy()
+    feature_df = feature_df[list(FEATURE_REGISTRY) + ["number"]]
+
+    tmp_path = output_path + ".tmp"
+    write_feature_file(feature_df, tmp_path)
+    os.replace(tmp_path, output_path)
+    print(f"[DONE] Updated {output_path}. Shape: {feature_df.shape}")
+
+def _rebuild_feature_file(input_path, output_path, chunked=False, n_workers=None):
+    """
+    Recreate a feature file (and its text matrix, if it had one) from its raw file.
+    """
+    text_path = text_features_path(output_path)
+    had_text = os.path.exists(text_path)
+    for path in (output_path, text_path):
+        if os.path.exists(path):
+            os.remove(path)
+    if chunked:
+        generate_features_chunked(input_path, output_path, n_workers, text_features=had_text)
+    else:
+        generate_features(input_path, output_path, text_features=had_text)
+
+def regenerate_features(raw_dir, feature_dir, text_features=False, n_workers=None):
+    """
+    Walk every raw issues file and make its feature file current: create missing files
+    and recompute only missing/outdated columns of existing ones. The full backfill file
+    goes through the chunked process-pool path; days without issues are skipped.
+    """
+    raw_files = sorted(
+        f for f in os.listdir(raw_dir)
+        if f.startswith("issues_closed_") and f.endswith(".parquet") and not f.endswith("_body.parquet")
+    )
+    for raw_file in raw_files:
+        suffix = raw_file[len("issues_closed_"):]
+        input_path = os.path.join(raw_dir, raw_file)
+        output_path = os.path.join(feature_dir, f"issues_features_{suffix}")
+        if raw_issue_count(input_path) == 0:
+            print(f"[SKIP] Input file {input_path} has no rows.")
+            continue
+        chunked = raw_file == "issues_closed_full.parquet"
+        # Creates missing feature/text files; no-op when both already exist
+        if chunked:
+            generate_features_chunked(input_path, output_path, n_workers, text_features=text_features)
+        else:
+            generate_features(input_path, output_path, text_features=text_features)
+        update_feature_file(input_path, output_path, chunked=chunked, n_workers=n_workers)
 
 # merge_features.py
 
-def merge_features(feature_dir, output_name="issues_features_merged.parquet"):
+def merge_features(feature_dir, output_name="issues_features_merged.parquet", window=None):
+    """
+    Merge the full and incremental feature files into output_name.
+    With a training window (see model_utils.apply_training_window), max_days/max_rows are
+    applied here as a retention policy: row groups that cannot fall inside the window are
+    skipped using the closed_at statistics in the Parquet footers, and the remaining rows
+    are trimmed to the window. Merging and loading then cost O(window), not O(history).
+    """
+    import numpy as np
+    import pandas as pd
+    from utils.model_utils import apply_training_window
     files = [f for f in os.listdir(feature_dir) if f.endswith(".parquet")]
     if not files:
         print("[ERROR] No parquet files found in features directory.")
@@ -160,35 +681,207 @@ def merge_features(feature_dir, output_name="issues_features_merged.parquet"):
     for f in files:
         if f == "issues_features_full.parquet":
             full_file = f
-        elif f.startswith("issues_features_"):
+        elif f.startswith("issues_features_") and f != output_name:
+            # Daily and compacted monthly files; never re-read a previous merge output
             daily_files.append(f)
-
-    dfs = []
     if full_file:
         print(f"[INFO] Found full features: {full_file}")
-        full_path = os.path.join(feature_dir, full_file)
-        full_df = pd.read_parquet(full_path)
-        dfs.append(full_df)
-        try:
-            full_latest = full_df["number"].max()  
-        except:
-            full_latest = None
-        if full_latest:
-            for dfname in daily_files:
-                daily_df = pd.read_parquet(os.path.join(feature_dir, dfname))
-                if "number" in daily_df.columns:
-                    daily_df = daily_df[~daily_df["number"].isin(full_df["number"])]
-                if not daily_df.empty:
-                    dfs.append(daily_df)
     else:
         print("[WARN] No full features file found, merging all incrementals.")
-        for dfname in daily_files:
-            daily_df = pd.read_parquet(os.path.join(feature_dir, dfname))
-            dfs.append(daily_df)
+    # The full file comes first, so it wins over incrementals for duplicate issue numbers
+    paths = [os.path.join(feature_dir, f) for f in ([full_file] if full_file else []) + sorted(daily_files)]
+
+    retention = {k: v for k, v in (window or {}).items() if k in ("max_days", "max_rows") and v}
+    row_groups = _row_groups_in_window(paths, **retention)
+
+    dfs = []
+    # Hashed text matrices aligned with dfs; None where a file has no text features
+    texts = []
+    versions = []
+    for path in paths:
+        groups, positions = row_groups[path]
+        if not groups:
+            print(f"[SKIP] {os.path.basename(path)} has no rows in the training window.")
+            continue
+        df = _read_row_groups(path, groups)
+        text = _load_text_matrix(path)
+        dfs.append(df)
+        texts.append(text[positions] if text is not None else None)
+        versions.append(read_feature_versions(path))
+    if not dfs:
+        print("[ERROR] No feature rows found in features directory.")
+        return
 
     merged = pd.concat(dfs, ignore_index=True)
-    merged = merged.drop_duplicates(subset=["number"])
+    keep = (~merged.duplicated(subset=["number"])).to_numpy().copy()
+    if retention:
+        in_window, _ = apply_training_window(merged[keep], retention)
+        keep[np.flatnonzero(keep)[~in_window]] = False
+    merged = merged[keep]
 
     out_path = os.path.join(feature_dir, output_name)
-    merged.to_parquet(out_path, index=False)
+    merged_versions = _common_feature_versions(versions)
+    if merged_versions != current_feature_versions():
+        print("[WARN] Some feature files are outdated. Run generate_features.py --mode regenerate first.")
+    write_feature_file(merged, out_path, merged_versions)
     print(f"[DONE] Merged features saved to {out_path}. Shape: {merged.shape}")
+    _write_text_matrix(texts, keep, out_path)
+
+def _closed_at_range(metadata, row_group, column_index):
+    # (min, max) closed_at of a row group from its footer statistics, or None if unknown
+    import pandas as pd
+    if column_index < 0:
+        return None
+    stats = metadata.row_group(row_group).column(column_index).statistics
+    if stats is None or not stats.has_min_max:
+        return None
+    low, high = pd.Timestamp(stats.min), pd.Timestamp(stats.max)
+    if low.tzinfo is None:
+        low, high = low.tz_localize("UTC"), high.tz_localize("UTC")
+    return low, high
+
+def _row_groups_in_window(paths, max_days=None, max_rows=None):
+    """
+    For every feature file, the row groups that may hold rows inside the window and
+    their row positions (for slicing the text matrix). Only Parquet footers are read.
+    Row groups without closed_at statistics are always kept.
+    """
+    import numpy as np
+    import pandas as pd
+    import pyarrow.parquet as pq
+    # (path, row group, first row position, rows, closed_at range)
+    groups = []
+    for path in paths:
+        metadata = pq.read_metadata(path)
+        column_index = metadata.schema.to_arrow_schema().get_field_index("closed_at")
+        offset = 0
+        for i in range(metadata.num_row_groups):
+            n_rows = metadata.row_group(i).num_rows
+            groups.append((path, i, offset, n_rows, _closed_at_range(metadata, i, column_index)))
+            offset += n_rows
+
+    known = [(n_rows, closed_range) for _, _, _, n_rows, closed_range in groups if closed_range is not None]
+    cutoff = None
+    if max_days and known:
+        cutoff = max(high for _, (_, high) in known) - pd.Timedelta(days=max_days)
+    if max_rows and known:
+        # Walk row groups from the newest oldest-row down: once they hold max_rows rows, the
+        # max_rows most recent issues all closed at or after the last oldest-row seen.
+        counted = 0
+        for n_rows, (low, _) in sorted(known, key=lambda g: g[1][0], reverse=True):
+            counted += n_rows
+            if counted >= max_rows:
+                cutoff = low if cutoff is None else max(cutoff, low)
+                break
+
+    selected = {path: ([], []) for path in paths}
+    for path, i, offset, n_rows, closed_range in groups:
+        if cutoff is not None and closed_range is not None and closed_range[1] < cutoff:
+            continue
+        selected[path][0].append(i)
+        selected[path][1].extend(range(offset, offset + n_rows))
+    return {path: (ids, np.asarray(positions, dtype=np.int64)) for path, (ids, positions) in selected.items()}
+
+def _read_row_groups(path, row_groups):
+    import pyarrow.parquet as pq
+    pf = pq.ParquetFile(path)
+    if len(row_groups) == pf.num_row_groups:
+        return pf.read().to_pandas()
+    return pf.read_row_groups(row_groups).to_pandas()
+
+def _common_feature_versions(versions):
+    # A combined file only vouches for feature versions shared by every input
+    return {
+        name: version for name, version in versions[0].items()
+        if all(v.get(name) == version for v in versions[1:])
+    }
+
+def _write_text_matrix(texts, keep, out_path):
+    """
+    Stack per-file text matrices, keep the rows selected by the boolean mask keep and save
+    them next to out_path. Removes any existing matrix when some inputs have no text features.
+    """
+    import scipy.sparse as sp
+    out_text_path = text_features_path(out_path)
+    if all(t is not None for t in texts):
+        merged_text = sp.vstack(texts, format="csr")[keep]
+        sp.save_npz(out_text_path, merged_text)
+        print(f"[DONE] Text features saved to {out_text_path}. Shape: {merged_text.shape}")
+    else:
+        if any(t is not None for t in texts):
+            print("[WARN] Some feature files have no text features; skipping merged text matrix.")
+        # Never leave a stale matrix that no longer lines up with the merged rows
+        if os.path.exists(out_text_path):
+            os.remove(out_text_path)
+
+def _load_text_matrix(feature_path):
+    import scipy.sparse as sp
+    text_path = text_features_path(feature_path)
+    return sp.load_npz(text_path).tocsr() if os.path.exists(text_path) else None
+
+# compact_daily_files.py
+
+import re
+
+def compact_daily_files(raw_dir, feature_dir, compact_after_days=31, today=None, write_options=None):
+    """
+    Fold daily raw and feature files into monthly ones (issues_closed_YYYY-MM.parquet,
+    issues_features_YYYY-MM.parquet) once the whole month is more than compact_after_days old,
+    so the number of files touched per run stays roughly constant.
+    regenerate_features maps a monthly raw file to the monthly feature file like a daily one.
+    """
+    today = today or datetime.utcnow().date()
+    cutoff = today - timedelta(days=compact_after_days)
+    for directory, prefix, compact_month in (
+        (raw_dir, "issues_closed_", _compact_raw_month),
+        (feature_dir, "issues_features_", _compact_feature_month),
+    ):
+        months = {}
+        for f in os.listdir(directory):
+            m = re.match(rf"^{prefix}(\d{{4}}-\d{{2}})-\d{{2}}\.parquet$", f)
+            if m:
+                months.setdefault(m.group(1), []).append(f)
+        for month, files in sorted(months.items()):
+            next_month = (datetime.strptime(month, "%Y-%m").date() + timedelta(days=32)).replace(day=1)
+            if next_month > cutoff:
+                continue
+            compact_month(directory, month, sorted(files), write_options)
+
+def _compact_raw_month(raw_dir, month, daily_files, write_options):
+    import pandas as pd
+    out_path = os.path.join(raw_dir, f"issues_closed_{month}.parquet")
+    daily_paths = [os.path.join(raw_dir, f) for f in daily_files]
+    paths = ([out_path] if os.path.exists(out_path) else []) + daily_paths
+    dfs = [df for df in (load_raw_issues(p) for p in paths) if not df.empty]
+    if dfs:
+        df = pd.concat(dfs, ignore_index=True)
+        # Later files win for issues fetched more than once
+        df = df.drop_duplicates(subset=["number"], keep="last")
+        write_raw_issues(df, out_path, write_options)
+        print(f"[DONE] Compacted {len(daily_files)} raw files into {out_path}. Rows: {len(df)}")
+    for path in daily_paths:
+        os.remove(path)
+        if os.path.exists(raw_body_path(path)):
+            os.remove(raw_body_path(path))
+
+def _compact_feature_month(feature_dir, month, daily_files, write_options=None):
+    import pandas as pd
+    out_path = os.path.join(feature_dir, f"issues_features_{month}.parquet")
+    daily_paths = [os.path.join(feature_dir, f) for f in daily_files]
+    paths = ([out_path] if os.path.exists(out_path) else []) + daily_paths
+    dfs = [pd.read_parquet(p) for p in paths]
+    if any(not df.empty for df in dfs):
+        texts = [_load_text_matrix(p) for p in paths]
+        versions = [read_feature_versions(p) for p in paths]
+        df = pd.concat(dfs, ignore_index=True)
+        keep = ~df.duplicated(subset=["number"], keep="last")
+        write_feature_file(df[keep], out_path, _common_feature_versions(versions))
+        _write_text_matrix(texts, keep.values, out_path)
+        print(f"[DONE] Compacted {len(daily_files)} feature files into {out_path}. Rows: {int(keep.sum())}")
+    if os.path.exists(feature_stats_path(out_path)):
+        os.remove(feature_stats_path(out_path))
+    for path in daily_paths:
+        os.remove(path)
+        for sidecar in (text_features_path(path), feature_stats_path(path)):
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
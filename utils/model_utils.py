@@ -1,9 +1,7 @@
 import os
 import json
-import pandas as pd
 from datetime import datetime
-import optuna
-import xgboost as xgb
+from utils.data_utils import text_features_path
 
 # search_best_params.py
 
@@ -13,13 +11,89 @@ def load_config(config_path):
             return json.load(f)
     return {}
 
-def load_data(feature_path):
+# Columns stored in feature files that are not model inputs
+NON_FEATURE_COLUMNS = ["closed_within_7_days", "number", "closed_at"]
+
+def apply_training_window(df, window=None):
+    """
+    Restrict a feature frame to the configured training window.
+    window keys (all optional):
+      max_days       - keep issues closed within N days of the most recent one
+      max_rows       - keep at most the N most recently closed issues
+      half_life_days - weight each row by 0.5 ** (age_days / half_life_days)
+    Ages are measured from the newest closed_at in df, so a given file always yields
+    the same window. Returns (keep, weights): keep is a boolean mask over row positions
+    of df, weights holds one weight per kept row and is None unless half_life_days is set.
+    """
+    import numpy as np
+    import pandas as pd
+    window = window or {}
+    max_days = window.get("max_days")
+    max_rows = window.get("max_rows")
+    half_life_days = window.get("half_life_days")
+    if not (max_days or max_rows or half_life_days):
+        return np.ones(len(df), dtype=bool), None
+    if "closed_at" not in df.columns or df["closed_at"].isna().all():
+        print("[WARN] Features have no closed_at column, using all rows. Run generate_features.py --mode regenerate.")
+        return np.ones(len(df), dtype=bool), None
+
+    closed_at = pd.to_datetime(df["closed_at"], utc=True)
+    age_days = (closed_at.max() - closed_at).dt.total_seconds() / 86400
+    # Rows without closed_at have no age and fall outside any window
+    keep = age_days.notna()
+    if max_days:
+        keep &= age_days <= max_days
+    if max_rows:
+        keep &= age_days.rank(method="first") <= max_rows
+    print(f"[INFO] Training window keeps {int(keep.sum())} of {len(df)} rows")
+
+    keep = keep.to_numpy(dtype=bool)
+    weights = None
+    if half_life_days:
+        weights = (0.5 ** (age_days[keep] / half_life_days)).to_numpy()
+    return keep, weights
+
+def load_data(feature_path, use_text=False, window=None):
+    """
+    Load features, labels and optional sample weights (see apply_training_window).
+    """
+    import numpy as np
+    import pandas as pd
     df = pd.read_parquet(feature_path)
-    X = df.drop(columns=["closed_within_7_days", "number"], errors="ignore")
+    keep, weights = apply_training_window(df, window)
+    rows = np.flatnonzero(keep)
+    df = df.iloc[rows]
+    X = df.drop(columns=NON_FEATURE_COLUMNS, errors="ignore")
     y = df["closed_within_7_days"]
-    return X, y
-
-def objective(trial, X, y):
+    if use_text:
+        # Text matrix rows follow the Parquet row order, so select them by position
+        X = attach_text_features(X, feature_path, rows=rows)
+    return X, y, weights
+
+def attach_text_features(X, feature_path, rows=None):
+    """
+    Append the hashed text matrix stored next to feature_path to the meta features.
+    The result stays CSR and is passed to XGBoost as is, never densified.
+    XGBoost treats entries absent from a sparse matrix as missing, so every non-NaN
+    meta cell is stored explicitly, zeros included.
+    """
+    import numpy as np
+    import scipy.sparse as sp
+    text_path = text_features_path(feature_path)
+    if not os.path.exists(text_path):
+        raise FileNotFoundError(f"Text features {text_path} not found. Generate features with text enabled first.")
+    text = sp.load_npz(text_path).tocsr()
+    if rows is not None:
+        text = text[rows]
+    if text.shape[0] != len(X):
+        raise ValueError(f"Text features have {text.shape[0]} rows but {feature_path} has {len(X)}.")
+    values = X.to_numpy(dtype=np.float32)
+    row_idx, col_idx = np.nonzero(~np.isnan(values))
+    meta = sp.coo_matrix((values[row_idx, col_idx], (row_idx, col_idx)), shape=values.shape).tocsr()
+    return sp.hstack([meta, text], format="csr")
+
+def objective(trial, X, y, weights=None):
+    import xgboost as xgb
     param = {
         'objective': 'binary:logistic',
         'eval_metric': 'auc',
@@ -35,7 +109,7 @@ def objective(trial, X, y):
         'n_estimators': trial.suggest_int('n_estimators', 100, 600),
         'random_state': 42,
     }
-    dtrain = xgb.DMatrix(X, label=y)
+    dtrain = xgb.DMatrix(X, label=y, weight=weights)
     cv_results = xgb.cv(
         param,
         dtrain,
@@ -51,11 +125,12 @@ def objective(trial, X, y):
     best_auc = cv_results["test-auc-mean"].max()
     return 1.0 - best_auc
 
-def search_best_params(feature_path, n_trials, model_dir, param_dir):
-    X, y = load_data(feature_path)
+def search_best_params(feature_path, n_trials, model_dir, param_dir, use_text=False, window=None):
+    import optuna
+    X, y, weights = load_data(feature_path, use_text=use_text, window=window)
     study = optuna.create_study(direction="minimize")
     print(f"[INFO] Hyperparameter search with {n_trials} trials ...")
-    study.optimize(lambda trial: objective(trial, X, y), n_trials=n_trials)
+    study.optimize(lambda trial: objective(trial, X, y, weights), n_trials=n_trials)
 
     print("Best params:", study.best_params)
     auc = 1.0 - study.best_value
@@ -80,14 +155,19 @@ def search_best_params(feature_path, n_trials, model_dir, param_dir):
         json.dump(study.best_params, f, indent=2)
     print(f"[SNAPSHOT] params snapshot: {hist_path}")
 
+    # Distribution the params were tuned on; later runs compare new days against it for drift
+    from utils.monitor_utils import save_reference_stats, REFERENCE_STATS_NAME
+    save_reference_stats(feature_path, os.path.join(param_dir, REFERENCE_STATS_NAME), window=window)
+
     return auc
 
 # train_model.py
 
-def train_xgboost(features_path, params_path, model_out):
+def train_xgboost(features_path, params_path, model_out, use_text=False, window=None):
+    import xgboost as xgb
     # Load features
-    df = pd.read_parquet(features_path)
-    print(f"[INFO] Loaded features: {features_path}, shape: {df.shape}")
+    X, y, weights = load_data(features_path, use_text=use_text, window=window)
+    print(f"[INFO] Loaded features: {features_path}, shape: {X.shape}")
 
     # Load best params
     with open(params_path, "r") as f:
@@ -95,9 +175,8 @@ def train_xgboost(features_path, params_path, model_out):
     print(f"[INFO] Using best params from: {params_path}")
     n_estimators = best_params.pop("n_estimators", 200)
 
-    # Prepare data
-    X = df.drop(["closed_within_7_days", "number"], axis=1)
-    y = df["closed_within_7_days"]
+    if use_text:
+        print(f"[INFO] Using hashed text features, nnz: {X.nnz}")
 
     # Train XGBoost
     model = xgb.XGBClassifier(
@@ -106,7 +185,7 @@ def train_xgboost(features_path, params_path, model_out):
         n_estimators=n_estimators,
         **best_params
     )
-    model.fit(X, y)
+    model.fit(X, y, sample_weight=weights)
     acc = model.score(X, y)
     print(f"[DONE] Model trained, ACC on train: {acc:.4f}")
 
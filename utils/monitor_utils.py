@@ -0,0 +1,240 @@
+# utils/monitor_utils.py
+
+import os
+import re
+import json
+import math
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from utils.data_utils import feature_stats_path, read_feature_versions
+
+# Feature statistics are mergeable log-bucket histograms: a value v falls into bucket
+# sign(v) * floor(log1p(|v|) / log(SKETCH_GAMMA)), so buckets are ~5% wide and small
+# integers (hours, label counts) keep their own bucket. Daily stats are computed once
+# per file and summed to get the distribution of any set of days.
+SKETCH_GAMMA = 1.05
+REFERENCE_STATS_NAME = "reference_stats.json"
+DAILY_FEATURE_RE = re.compile(r"^issues_features_(\d{4}-\d{2}-\d{2})\.parquet$")
+
+DEFAULT_MONITORING = {
+    # PSI above this on any feature counts as drift (0.1-0.2 moderate, > 0.2 significant)
+    "psi_threshold": 0.2,
+    # Number of calendar days, ending at the run date, compared with the reference
+    "recent_days": 7,
+    # Days with fewer rows than this (or no daily file at all) are reported as low volume
+    "min_daily_rows": 1,
+    "skip_search_without_drift": True,
+    "skip_train_without_drift": False,
+}
+
+# feature statistics
+
+def sketch_frame(df):
+    """
+    Histogram every model input column of a feature frame.
+    Returns {"rows": n, "features": {name: {"missing": m, "buckets": {bucket: count}}}}.
+    """
+    import numpy as np
+    import pandas as pd
+    from utils.model_utils import NON_FEATURE_COLUMNS
+
+    stats = {"rows": int(len(df)), "features": {}}
+    for col in df.columns:
+        if col in NON_FEATURE_COLUMNS:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+        missing = np.isnan(values)
+        present = values[~missing]
+        buckets = np.sign(present) * np.floor(np.log1p(np.abs(present)) / math.log(SKETCH_GAMMA))
+        keys, counts = np.unique(buckets.astype(int), return_counts=True)
+        stats["features"][col] = {
+            "missing": int(missing.sum()),
+            "buckets": {str(k): int(c) for k, c in zip(keys, counts)},
+        }
+    return stats
+
+def merge_stats(stats_list):
+    """
+    Sum several stats dicts produced by sketch_frame.
+    """
+    merged = {"rows": 0, "features": {}}
+    for stats in stats_list:
+        merged["rows"] += stats["rows"]
+        for name, feat in stats["features"].items():
+            target = merged["features"].setdefault(name, {"missing": 0, "buckets": {}})
+            target["missing"] += feat["missing"]
+            for key, count in feat["buckets"].items():
+                target["buckets"][key] = target["buckets"].get(key, 0) + count
+    return merged
+
+def compute_feature_stats(feature_path):
+    """
+    Return the stats of one feature file, computing and caching them next to the file
+    on first use. Cached stats are recomputed whenever the feature file is rewritten.
+    """
+    import pandas as pd
+
+    stats_path = feature_stats_path(feature_path)
+    source_mtime = os.path.getmtime(feature_path)
+    if os.path.exists(stats_path):
+        with open(stats_path, "r") as f:
+            stats = json.load(f)
+        if stats.get("source_mtime") == source_mtime:
+            return stats
+
+    stats = sketch_frame(pd.read_parquet(feature_path))
+    stats["source_mtime"] = source_mtime
+    stats["feature_versions"] = read_feature_versions(feature_path)
+    with open(stats_path, "w") as f:
+        json.dump(stats, f)
+    print(f"[STATS] {feature_path}: {stats['rows']} rows")
+    return stats
+
+def daily_feature_files(feature_dir):
+    """
+    Daily feature files as (date string, path), oldest first.
+    """
+    files = []
+    for f in os.listdir(feature_dir):
+        m = DAILY_FEATURE_RE.match(f)
+        if m:
+            files.append((m.group(1), os.path.join(feature_dir, f)))
+    return sorted(files)
+
+def compute_daily_stats(feature_dir, days=None):
+    """
+    Make sure the daily feature files of the given dates (default: all) have cached stats;
+    only new or rewritten files are read. Dates without a daily file are left out.
+    """
+    return {
+        date: compute_feature_stats(path) for date, path in daily_feature_files(feature_dir)
+        if days is None or date in days
+    }
+
+def recent_days(run_date=None, n_days=7):
+    """
+    The n_days calendar dates ending at run_date ("YYYY-MM-DD", default yesterday in UTC,
+    the day the daily flow fetches), oldest first.
+    """
+    if run_date is None:
+        end = (datetime.utcnow() - timedelta(days=1)).date()
+    else:
+        end = datetime.strptime(run_date, "%Y-%m-%d").date()
+    return [str(end - timedelta(days=i)) for i in reversed(range(n_days))]
+
+def save_reference_stats(feature_path, reference_path, window=None):
+    """
+    Store the distribution of the training data (after the training window) as the drift reference.
+    """
+    import pandas as pd
+    from utils.model_utils import apply_training_window
+
+    df = pd.read_parquet(feature_path)
+    keep, _ = apply_training_window(df, window)
+    stats = sketch_frame(df[keep])
+    with open(reference_path, "w") as f:
+        json.dump(stats, f)
+    print(f"[SAVE] Reference feature stats saved: {reference_path}")
+    return stats
+
+# drift
+
+def _coarse_bins(reference_feature, n_bins):
+    """
+    Upper bucket keys splitting the reference into ~n_bins equally populated bins.
+    """
+    keys = sorted(int(k) for k in reference_feature["buckets"])
+    total = sum(reference_feature["buckets"].values())
+    cuts = []
+    level = 1
+    cumulative = 0
+    for key in keys:
+        cumulative += reference_feature["buckets"][str(key)]
+        if cumulative >= total * level / n_bins:
+            cuts.append(key)
+            # A heavy bucket may cover several quantile levels at once
+            while level < n_bins and cumulative >= total * level / n_bins:
+                level += 1
+    return cuts
+
+def _bin_counts(feature, cuts):
+    # Last slot collects missing values, the one before it values above the last cut
+    counts = [0] * (len(cuts) + 2)
+    for key, count in feature["buckets"].items():
+        counts[bisect_left(cuts, int(key))] += count
+    counts[-1] += feature["missing"]
+    return counts
+
+def population_stability_index(reference_feature, current_feature, n_bins=10, eps=1e-4):
+    """
+    PSI = sum((cur% - ref%) * ln(cur% / ref%)) over bins taken from reference quantiles.
+    """
+    cuts = _coarse_bins(reference_feature, n_bins)
+    ref_counts = _bin_counts(reference_feature, cuts)
+    cur_counts = _bin_counts(current_feature, cuts)
+    ref_total = sum(ref_counts) or 1
+    cur_total = sum(cur_counts) or 1
+    psi = 0.0
+    for ref, cur in zip(ref_counts, cur_counts):
+        ref_pct = max(ref / ref_total, eps)
+        cur_pct = max(cur / cur_total, eps)
+        psi += (cur_pct - ref_pct) * math.log(cur_pct / ref_pct)
+    return psi
+
+def check_drift(feature_dir, reference_path, monitoring=None, run_date=None):
+    """
+    Compare the last recent_days calendar days up to run_date with the reference distribution.
+    Returns a report with per-feature PSI, row counts per day, days without a daily file and
+    low-volume days (missing days included). An empty "psi" means drift could not be judged.
+    """
+    monitoring = {**DEFAULT_MONITORING, **(monitoring or {})}
+    days = recent_days(run_date, monitoring["recent_days"])
+    daily_stats = compute_daily_stats(feature_dir, days)
+    daily_rows = {date: daily_stats[date]["rows"] if date in daily_stats else 0 for date in days}
+    report = {
+        "days": days,
+        "daily_rows": daily_rows,
+        "missing_days": [d for d in days if d not in daily_stats],
+        "low_volume_days": [d for d, n in daily_rows.items() if n < monitoring["min_daily_rows"]],
+        "psi": {},
+        "max_psi": None,
+        "drift": False,
+        "has_reference": os.path.exists(reference_path),
+    }
+    if not report["has_reference"] or not daily_stats:
+        return report
+
+    with open(reference_path, "r") as f:
+        reference = json.load(f)
+    current = merge_stats(list(daily_stats.values()))
+    if current["rows"] == 0:
+        return report
+    for name, ref_feature in reference["features"].items():
+        if name in current["features"]:
+            report["psi"][name] = round(population_stability_index(ref_feature, current["features"][name]), 4)
+    if report["psi"]:
+        report["max_psi"] = max(report["psi"].values())
+        report["drift"] = report["max_psi"] >= monitoring["psi_threshold"]
+    return report
+
+def decide_retraining(report, monitoring=None, has_params=True, force=False):
+    """
+    Decide whether the daily run needs the hyperparameter search and/or retraining.
+    Always runs both without a reference or saved params, when drift cannot be judged
+    (no recent rows to compare), or when forced.
+    Returns {"run_search": bool, "run_train": bool, "reason": str}.
+    """
+    monitoring = {**DEFAULT_MONITORING, **(monitoring or {})}
+    if force:
+        return {"run_search": True, "run_train": True, "reason": "forced"}
+    if not report["has_reference"] or not has_params:
+        return {"run_search": True, "run_train": True, "reason": "no reference stats or params yet"}
+    if not report["psi"]:
+        return {"run_search": True, "run_train": True, "reason": f"cannot judge drift: no rows on {report['days'][0]}..{report['days'][-1]}"}
+    if report["drift"]:
+        return {"run_search": True, "run_train": True, "reason": f"drift detected (max PSI {report['max_psi']})"}
+    return {
+        "run_search": not monitoring["skip_search_without_drift"],
+        "run_train": not monitoring["skip_train_without_drift"],
+        "reason": f"no drift (max PSI {report['max_psi']})",
+    }
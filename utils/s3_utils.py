@@ -1,8 +1,8 @@
 import os
-import boto3
 from datetime import datetime
 
 def download_model_from_s3(bucket_name, s3_key, local_dir, local_filename="latest_model.json"):
+    import boto3
     os.makedirs(local_dir, exist_ok=True)
     local_path = os.path.join(local_dir, local_filename)
     s3 = boto3.client("s3")
@@ -11,6 +11,7 @@ def download_model_from_s3(bucket_name, s3_key, local_dir, local_filename="lates
     return local_path
 
 def upload_model_to_s3(local_model_file, bucket_name, s3_key, with_history=True):
+    import boto3
     s3 = boto3.client("s3")
     # Upload main file
     s3.upload_file(local_model_file, bucket_name, s3_key)